@@ -1,10 +1,13 @@
 import os
+import math
 import ccxt
 import pandas as pd
 import numpy as np
 import time
 import logging
 import threading
+from bisect import bisect_left, bisect_right, insort
+from collections import deque
 from datetime import datetime, timezone
 from typing import Optional
 from sklearn.neighbors import KNeighborsClassifier
@@ -14,6 +17,7 @@ from pymongo import MongoClient
 from flask import Flask
 from dotenv import load_dotenv
 import requests
+from requests.adapters import HTTPAdapter
 
 # ----- LOAD ENV VARIABLES -----
 load_dotenv() 
@@ -75,6 +79,111 @@ class StrategyConfig:
         self.collection_name = f"{SYMBOL.replace('/', '_')}"
 
 
+# ---------- EXCHANGE CLIENT POOL ----------
+class TokenBucket:
+    """
+    Thread-safe token bucket: `rate` tokens per second, bursts up to `capacity`.
+    """
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                wait = (tokens - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class ExchangeClientPool:
+    """
+    Process-wide registry of ccxt clients. Each (exchange, market type) pair gets
+    one long-lived client whose HTTP session is reused by every trading thread,
+    markets are loaded once, and all calls share one token bucket.
+    """
+    REQUESTS_PER_SECOND = 8
+    BURST = 10
+    HTTP_POOL_SIZE = 16
+
+    _clients = {}
+    _lock = threading.Lock()
+    rate_limiter = TokenBucket(REQUESTS_PER_SECOND, BURST)
+
+    @classmethod
+    def get(cls, exchange_id: str = 'bybit', default_type: str = 'linear'):
+        key = (exchange_id, default_type)
+        client = cls._clients.get(key)
+        if client is not None:
+            return client
+
+        with cls._lock:
+            client = cls._clients.get(key)
+            if client is None:
+                client = getattr(ccxt, exchange_id)({
+                    # Throttling is done by the shared bucket; ccxt's own limiter is per instance
+                    'enableRateLimit': False,
+                    'options': {
+                        'defaultType': default_type
+                    }
+                })
+                adapter = HTTPAdapter(pool_connections=cls.HTTP_POOL_SIZE, pool_maxsize=cls.HTTP_POOL_SIZE)
+                client.session.mount('https://', adapter)
+                client.session.mount('http://', adapter)
+
+                cls.rate_limiter.acquire()
+                client.load_markets()
+                logger.info(f"Initialised shared {exchange_id} ({default_type}) client with {len(client.markets)} markets.")
+                cls._clients[key] = client
+        return client
+
+
+# ---------- MONGO CLIENT POOL ----------
+class MongoClientPool:
+    """
+    Process-wide MongoClient registry. MongoClient is thread-safe and keeps its
+    own connection pool, so every trading thread shares one client per URI
+    instead of opening a pool per component per symbol.
+    """
+    MAX_POOL_SIZE = 20
+    MIN_POOL_SIZE = 2
+
+    _clients = {}
+    _lock = threading.Lock()
+    _indexed = set()
+
+    @classmethod
+    def get(cls, uri: Optional[str] = MONGO_URI) -> MongoClient:
+        with cls._lock:
+            client = cls._clients.get(uri)
+            if client is None:
+                client = MongoClient(uri, maxPoolSize=cls.MAX_POOL_SIZE, minPoolSize=cls.MIN_POOL_SIZE)
+                cls._clients[uri] = client
+            return client
+
+    @classmethod
+    def ensure_trade_indexes(cls, collection):
+        """
+        (status, exit_time) serves the open-trade lookup, the last-closed-trade
+        lookup and the sorted closed-trade scan used by the analysis.
+        """
+        key = (collection.database.name, collection.name)
+        if key in cls._indexed:
+            return
+        # create_index is idempotent, so a concurrent duplicate call is harmless
+        collection.create_index([("status", 1), ("exit_time", 1)], name="status_exit_time")
+        cls._indexed.add(key)
+        logger.info(f"Ensured indexes on {collection.name}")
+
+
 # ---------- MARKET DATA FETCHER ----------
 class MarketDataFetcher:
     @staticmethod
@@ -120,7 +229,7 @@ class MarketDataFetcher:
         """
         Deletes the specified database from MongoDB.
         """
-        client = MongoClient()
+        client = MongoClientPool.get()
         client.drop_database(db_name)
         logger.info(f"❌ Deleted existing database: {db_name}")
 
@@ -128,13 +237,9 @@ class MarketDataFetcher:
     def fetch_binance_futures_ohlcv(symbol: str, timeframe: str, limit: int, last_known_ts: pd.Timestamp = None) -> Optional[pd.DataFrame]:
         """
         Fetches OHLCV data from Bybit Futures (similar to Binance but set for Bybit).
+        If last_known_ts is given, only the bars opened after it are requested,
+        so the result may be empty when no new candle has closed yet.
         """
-        exchange = ccxt.bybit({
-            'options': {
-                'defaultType': 'linear'  # For USDT perpetual contracts
-            }
-        })
-
         # Convert symbol to Bybit format
         if "/" in symbol:
             base, quote = symbol.split("/")
@@ -142,15 +247,27 @@ class MarketDataFetcher:
         else:
             futures_symbol = symbol
             
+        since = None
+        min_bars = 2
+        if last_known_ts is not None:
+            tf_ms = MarketDataFetcher.timeframe_to_minutes(timeframe) * 60_000
+            since = int(last_known_ts.value // 1_000_000) + tf_ms
+            min_bars = 1  # only the unfinished candle means nothing new has closed
+
         max_retries = 2
         retry_delay = 15
 
         for attempt in range(max_retries):
             try:
-                logger.info(f"Fetching {limit} bars for {symbol} on {timeframe} (Attempt {attempt+1}/{max_retries})...")
-                ohlcv = exchange.fetch_ohlcv(futures_symbol, timeframe, since=None, limit=limit)
+                if since is None:
+                    logger.info(f"Fetching {limit} bars for {symbol} on {timeframe} (Attempt {attempt+1}/{max_retries})...")
+                else:
+                    logger.info(f"Fetching bars after {last_known_ts} for {symbol} on {timeframe} (Attempt {attempt+1}/{max_retries})...")
+                exchange = ExchangeClientPool.get('bybit', 'linear')  # For USDT perpetual contracts
+                ExchangeClientPool.rate_limiter.acquire()
+                ohlcv = exchange.fetch_ohlcv(futures_symbol, timeframe, since=since, limit=limit)
 
-                if not ohlcv or len(ohlcv) < 2:
+                if not ohlcv or len(ohlcv) < min_bars:
                     logger.warning("No or insufficient data from Bybit.")
                     return None
 
@@ -178,6 +295,67 @@ class MarketDataFetcher:
                     return None
 
 
+# ---------- CANDLE STORE ----------
+class CandleStore:
+    """
+    Rolling per-symbol buffer of closed candles. The first refresh fetches a full
+    history; later refreshes only pull the bars that closed since the last one.
+    """
+    COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+
+    def __init__(self, config: StrategyConfig):
+        self.config = config
+        self.tf_delta = pd.Timedelta(minutes=MarketDataFetcher.timeframe_to_minutes(config.TIMEFRAME))
+        # LIMIT includes the unfinished candle that the fetcher drops
+        self.candles = deque(maxlen=config.LIMIT - 1)
+
+    @property
+    def last_ts(self) -> Optional[pd.Timestamp]:
+        return self.candles[-1][0] if self.candles else None
+
+    def _full_fetch(self) -> Optional[pd.DataFrame]:
+        df = MarketDataFetcher.fetch_binance_futures_ohlcv(
+            symbol=self.config.SYMBOL,
+            timeframe=self.config.TIMEFRAME,
+            limit=self.config.LIMIT
+        )
+        if df is None or df.empty:
+            return None
+        self.candles.clear()
+        self.candles.extend(df[self.COLUMNS].itertuples(index=False, name=None))
+        return df
+
+    def refresh(self) -> Optional[pd.DataFrame]:
+        """
+        Tops up the buffer and returns the buffered candles as a fresh DataFrame,
+        or None when nothing new has closed (or the fetch failed).
+        """
+        last_ts = self.last_ts
+        if last_ts is None:
+            return self._full_fetch()
+
+        new_bars = MarketDataFetcher.fetch_binance_futures_ohlcv(
+            symbol=self.config.SYMBOL,
+            timeframe=self.config.TIMEFRAME,
+            limit=self.config.LIMIT,
+            last_known_ts=last_ts
+        )
+        if new_bars is None:
+            return None
+        new_bars = new_bars[new_bars['timestamp'] > last_ts]
+        if new_bars.empty:
+            logger.info(f"No new closed candle for {self.config.SYMBOL} after {last_ts}.")
+            return None
+
+        if new_bars.iloc[0]['timestamp'] != last_ts + self.tf_delta:
+            logger.warning(f"Gap detected after {last_ts} for {self.config.SYMBOL}. Refetching full history.")
+            return self._full_fetch()
+
+        self.candles.extend(new_bars[self.COLUMNS].itertuples(index=False, name=None))
+        logger.info(f"Appended {len(new_bars)} new bar(s); buffer holds {len(self.candles)} bars.")
+        return pd.DataFrame(list(self.candles), columns=self.COLUMNS)
+
+
 # ---------- TECHNICAL INDICATORS ----------
 class TechnicalIndicators:
     @staticmethod
@@ -244,11 +422,402 @@ class TechnicalIndicators:
         logger.info("Indicators calculated.")
         return df
 
+    @staticmethod
+    def calculate_indicators_incremental(df: pd.DataFrame, config: StrategyConfig, engine: "IndicatorEngine") -> pd.DataFrame:
+        """
+        Same columns as calculate_indicators, but only the bars the engine has
+        not seen yet are computed.
+        """
+        logger.info("Updating technical indicators incrementally...")
+        df = engine.sync(df)
+        logger.info("Indicators calculated.")
+        return df
+
+
+# ---------- STREAMING INDICATOR ENGINE ----------
+def _ieee_div(num: float, den: float) -> float:
+    """
+    Division with numpy/pandas semantics (x/0 -> +-inf, 0/0 -> nan) for Python floats.
+    """
+    if den == 0:
+        if num == 0 or num != num:
+            return np.nan
+        return math.copysign(math.inf, num) * math.copysign(1.0, den)
+    return num / den
+
+
+def _nan_max(a: float, b: float) -> float:
+    """
+    np.maximum for scalars: propagates NaN.
+    """
+    if a != a or b != b:
+        return np.nan
+    return a if a >= b else b
+
+
+class RollingMean:
+    """
+    O(1) fixed-window mean. Mirrors pandas' roll_mean kernel step by step
+    (Kahan compensated add/remove, sign clamping, constant-window shortcut),
+    so streaming a column gives the same floats as Series.rolling(window).mean().
+    """
+    def __init__(self, window: int):
+        self.window = window
+        self.values = deque()
+        self.nobs = 0
+        self.sum_x = 0.0
+        self.comp_add = 0.0
+        self.comp_remove = 0.0
+        self.neg_ct = 0
+        self.same_ct = 0
+        self.prev_value = np.nan
+
+    def _add(self, val: float):
+        if val == val:
+            self.nobs += 1
+            y = val - self.comp_add
+            t = self.sum_x + y
+            self.comp_add = t - self.sum_x - y
+            self.sum_x = t
+            if math.copysign(1.0, val) < 0:
+                self.neg_ct += 1
+            if val == self.prev_value:
+                self.same_ct += 1
+            else:
+                self.same_ct = 1
+            self.prev_value = val
+
+    def _remove(self, val: float):
+        if val == val:
+            self.nobs -= 1
+            y = -val - self.comp_remove
+            t = self.sum_x + y
+            self.comp_remove = t - self.sum_x - y
+            self.sum_x = t
+            if math.copysign(1.0, val) < 0:
+                self.neg_ct -= 1
+
+    def update(self, val: float) -> float:
+        if len(self.values) == self.window:
+            self._remove(self.values.popleft())
+        self.values.append(val)
+        self._add(val)
+
+        if self.nobs >= self.window and self.nobs > 0:
+            result = self.sum_x / self.nobs
+            if self.same_ct >= self.nobs:
+                result = self.prev_value
+            elif self.neg_ct == 0 and result < 0:
+                result = 0.0
+            elif self.neg_ct == self.nobs and result > 0:
+                result = 0.0
+            return result
+        return np.nan
+
+
+class ExponentialMean:
+    """
+    O(1) ewm(span=..., adjust=False).mean(), replicating pandas' ewm kernel.
+    """
+    def __init__(self, span: int):
+        com = (span - 1) / 2.0
+        alpha = 1.0 / (1.0 + com)
+        self.old_wt = 1.0 - alpha
+        self.new_wt = alpha
+        self.weighted = None
+
+    def update(self, val: float) -> float:
+        if self.weighted is None:
+            self.weighted = val
+        elif self.weighted == self.weighted:
+            if val == val and self.weighted != val:
+                self.weighted = (self.old_wt * self.weighted + self.new_wt * val) / (self.old_wt + self.new_wt)
+        elif val == val:
+            self.weighted = val
+        return self.weighted
+
+
+class IndicatorEngine:
+    """
+    Stateful per-symbol version of TechnicalIndicators.calculate_indicators.
+    Every new bar updates RSI, CCI, EMA, SMA, ATR, ADX and WT in O(1) and the
+    results are kept in a history buffer aligned with the candle buffer.
+
+    Replaying a frame from a fresh engine (see `replay`) yields exactly the
+    numbers of the pandas batch code. In live mode the state runs continuously
+    instead of restarting at the first row of every 1000-bar window.
+    """
+    COLUMNS = ["RSI", "CCI", "EMA", "SMA", "ATR", "ADX", "WT"]
+
+    def __init__(self, config: StrategyConfig, history: Optional[int] = None):
+        self.config = config
+        self.history = deque(maxlen=history or config.LIMIT)
+        self.reset()
+
+    def reset(self):
+        config = self.config
+        self.history.clear()
+        self.last_ts = None
+        self.prev_close = np.nan
+        self.prev_high = np.nan
+        self.prev_low = np.nan
+
+        self.rsi_gain = RollingMean(config.RSI_PERIOD)
+        self.rsi_loss = RollingMean(config.RSI_PERIOD)
+        self.cci_mean = RollingMean(config.CCI_PERIOD)
+        self.cci_dev = RollingMean(config.CCI_PERIOD)
+        self.ema = ExponentialMean(config.EMA_PERIOD)
+        self.sma = RollingMean(config.SMA_PERIOD)
+        self.atr = RollingMean(config.ATR_PERIOD)
+        self.plus_dm = RollingMean(config.ADX_PERIOD)
+        self.minus_dm = RollingMean(config.ADX_PERIOD)
+        self.tr = RollingMean(config.ADX_PERIOD)
+        self.adx = RollingMean(config.ADX_PERIOD)
+        self.wt_esa = ExponentialMean(config.WT_CHANNEL_LENGTH)
+        self.wt_d = ExponentialMean(config.WT_ATR_LENGTH)
+
+    def update(self, ts: pd.Timestamp, high: float, low: float, close: float) -> tuple:
+        high, low, close = float(high), float(low), float(close)
+
+        # RSI
+        delta = close - self.prev_close
+        gain = self.rsi_gain.update(delta if delta > 0 else 0.0)
+        loss = self.rsi_loss.update(-(delta if delta < 0 else 0.0))
+        rs = _ieee_div(gain, loss)
+        rsi = 100 - _ieee_div(100, 1 + rs)
+
+        # CCI
+        tp = (high + low + close) / 3
+        cci_mean = self.cci_mean.update(tp)
+        mean_dev = self.cci_dev.update(abs(tp - cci_mean))
+        cci = _ieee_div(tp - cci_mean, 0.015 * mean_dev)
+
+        # EMA, SMA, ATR
+        ema = self.ema.update(close)
+        sma = self.sma.update(close)
+        atr = self.atr.update(high - low)
+
+        # ADX
+        tr = _nan_max(high - low, _nan_max(abs(high - self.prev_close), abs(low - self.prev_close)))
+        up_move = high - self.prev_high
+        down_move = -(low - self.prev_low)
+        plus_dm = up_move if (up_move > down_move) and (up_move > 0) else 0.0
+        minus_dm = down_move if (down_move > up_move) and (down_move > 0) else 0.0
+        tr_mean = self.tr.update(tr)
+        plus_di = 100 * _ieee_div(self.plus_dm.update(plus_dm), tr_mean)
+        minus_di = 100 * _ieee_div(self.minus_dm.update(minus_dm), tr_mean)
+        dx = 100 * _ieee_div(abs(plus_di - minus_di), plus_di + minus_di)
+        adx = self.adx.update(dx)
+
+        # WaveTrend (hlc3 is the same value as tp)
+        esa = self.wt_esa.update(tp)
+        d = self.wt_d.update(abs(tp - esa))
+        wt = _ieee_div(tp - esa, 0.015 * d)
+
+        self.prev_close, self.prev_high, self.prev_low = close, high, low
+        self.last_ts = ts
+        values = (rsi, cci, ema, sma, atr, adx, wt)
+        self.history.append((ts,) + values)
+        return values
+
+    def _feed(self, df: pd.DataFrame):
+        for ts, high, low, close in zip(df["timestamp"], df["high"].values, df["low"].values, df["close"].values):
+            self.update(ts, high, low, close)
+
+    def _attach(self, df: pd.DataFrame) -> pd.DataFrame:
+        rows = list(self.history)[-len(df):]
+        indicators = pd.DataFrame(rows, columns=["timestamp"] + self.COLUMNS)
+        df = df.drop(columns=self.COLUMNS, errors="ignore").merge(indicators, on="timestamp", how="left")
+        df.dropna(inplace=True)
+        return df
+
+    def replay(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Batch mode: rebuild the state from the first row of df.
+        """
+        self.reset()
+        self._feed(df)
+        return self._attach(df)
+
+    def sync(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Streaming mode: only bars newer than the last processed one are pushed
+        through the engine. Falls back to a replay if df does not continue the
+        stream (first call, gap or refetched history).
+        """
+        if self.last_ts is None or not (df["timestamp"] == self.last_ts).any():
+            logger.info("Indicator engine out of sync. Replaying full frame...")
+            return self.replay(df)
+
+        self._feed(df[df["timestamp"] > self.last_ts])
+        return self._attach(df)
+
+
+# ---------- ROLLING ORDER STATISTICS ----------
+class RollingOrderStatistics:
+    """
+    Sliding window whose non-NaN values are also kept in sorted order, so the
+    percentile rank, quantile, max and min of the window cost one binary search
+    per bar instead of a rescan of the window.
+    """
+    def __init__(self, window: int):
+        self.window = window
+        self.values = deque()
+        self.sorted = []
+
+    def update(self, val: float):
+        if len(self.values) == self.window:
+            old = self.values.popleft()
+            if old == old:
+                del self.sorted[bisect_left(self.sorted, old)]
+        self.values.append(val)
+        if val == val:
+            insort(self.sorted, val)
+
+    @property
+    def full(self) -> bool:
+        return len(self.sorted) >= self.window
+
+    def rank_pct(self, val: float) -> float:
+        """
+        rolling(window).rank(pct=True) of `val` (average rank for ties).
+        """
+        if not self.full or val != val:
+            return np.nan
+        rank_min = bisect_left(self.sorted, val) + 1
+        rank_max = bisect_right(self.sorted, val)
+        return ((rank_min + rank_max) / 2) / len(self.sorted)
+
+    def quantile(self, q: float) -> float:
+        """
+        rolling(window).quantile(q) with linear interpolation.
+        """
+        if not self.full:
+            return np.nan
+        nobs = len(self.sorted)
+        if nobs == 1:
+            return self.sorted[0]
+        idx_with_fraction = q * (nobs - 1)
+        idx = int(idx_with_fraction)
+        if idx == idx_with_fraction:
+            return self.sorted[idx]
+        vlow, vhigh = self.sorted[idx], self.sorted[idx + 1]
+        return vlow + (vhigh - vlow) * (idx_with_fraction - idx)
+
+    def max(self) -> float:
+        return self.sorted[-1] if self.full else np.nan
+
+    def min(self) -> float:
+        return self.sorted[0] if self.full else np.nan
+
+
+class RollingWindowStat:
+    """
+    One rolling statistic ('rank', 'quantile', 'max' or 'min') over a feature
+    column. The window survives between pipeline runs, so only bars newer than
+    the previous call are pushed; results are cached per bar timestamp.
+
+    The returned values match pandas' rolling(window) over the frame passed in,
+    exactly as if the frame were rolled from scratch.
+    """
+    def __init__(self, window: int, kind: str, q: Optional[float] = None, history: int = 2000):
+        self.window = window
+        self.kind = kind
+        self.q = q
+        self.history = history
+        self.reset()
+
+    def reset(self):
+        self.stats = RollingOrderStatistics(self.window)
+        self.window_ts = deque(maxlen=self.window)
+        self.outputs = {}
+        self.output_order = deque()
+        self.last_ts = None
+
+    def _push(self, ts: int, val: float):
+        self.stats.update(val)
+        self.window_ts.append(ts)
+        if self.kind == 'rank':
+            out = self.stats.rank_pct(val)
+        elif self.kind == 'quantile':
+            out = self.stats.quantile(self.q)
+        elif self.kind == 'max':
+            out = self.stats.max()
+        else:
+            out = self.stats.min()
+
+        self.outputs[ts] = out
+        self.output_order.append(ts)
+        if len(self.output_order) > self.history:
+            self.outputs.pop(self.output_order.popleft(), None)
+        self.last_ts = ts
+
+    def _continues_stream(self, timestamps: list, values: np.ndarray) -> int:
+        """
+        Index of the first bar that still has to be pushed, or 0 if the frame
+        does not continue what this window has already seen.
+        """
+        if self.last_ts is None:
+            return 0
+        try:
+            p = timestamps.index(self.last_ts)
+        except ValueError:
+            return 0
+        k = min(self.window, p + 1)
+        if len(self.window_ts) < k:
+            return 0
+        if list(self.window_ts)[-k:] != timestamps[p - k + 1:p + 1]:
+            return 0
+        seen = np.array(list(self.stats.values)[-k:], dtype=float)
+        if not np.array_equal(seen, values[p - k + 1:p + 1], equal_nan=True):
+            return 0
+        return p + 1
+
+    def compute(self, timestamps: pd.Series, values: pd.Series) -> np.ndarray:
+        ts_list = timestamps.values.astype('datetime64[ns]').astype(np.int64).tolist()
+        vals = values.to_numpy(dtype=float)
+
+        start = self._continues_stream(ts_list, vals)
+        if start == 0:
+            self.reset()
+        for i in range(start, len(vals)):
+            self._push(ts_list[i], vals[i])
+
+        out = np.array([self.outputs.get(ts, np.nan) for ts in ts_list], dtype=float)
+
+        # Same min_periods rule as pandas, evaluated on this frame: bars whose
+        # window is not fully populated here are NaN even if the stream saw more.
+        observed = np.concatenate(([0], np.cumsum(~np.isnan(vals))))
+        nobs = observed[1:] - observed[np.maximum(np.arange(1, len(vals) + 1) - self.window, 0)]
+        out[nobs < self.window] = np.nan
+        return out
+
+
+class RollingFeatureState:
+    """
+    Per-symbol container for the RollingWindowStat objects used by the feature
+    pipeline. Passing None instead of a state computes every column in one pass.
+    """
+    def __init__(self):
+        self.stats = {}
+
+    def get(self, name: str, window: int, kind: str, q: Optional[float] = None) -> RollingWindowStat:
+        stat = self.stats.get(name)
+        if stat is None:
+            stat = self.stats[name] = RollingWindowStat(window, kind, q)
+        return stat
+
+    @staticmethod
+    def rolling(state: Optional["RollingFeatureState"], name: str, df: pd.DataFrame, column: str,
+                window: int, kind: str, q: Optional[float] = None) -> np.ndarray:
+        stat = state.get(name, window, kind, q) if state is not None else RollingWindowStat(window, kind, q)
+        return stat.compute(df['timestamp'], df[column])
+
 
 # ---------- DERIVED FEATURES ----------
 class DerivedFeatures:
     @staticmethod
-    def calculate_features(df: pd.DataFrame, config: StrategyConfig) -> pd.DataFrame:
+    def calculate_features(df: pd.DataFrame, config: StrategyConfig, state: Optional[RollingFeatureState] = None) -> pd.DataFrame:
         logger.info("Calculating derived features...")
 
         # Ensure needed columns
@@ -267,7 +836,10 @@ class DerivedFeatures:
 
         # Volatility Filter
         df["Volatility_Filter"] = df["ATR"] / df["close"]
-        percentile_80 = df["Volatility_Filter"].rolling(window=config.VOLATILITY_WINDOW).quantile(config.VOLATILITY_PERCENTILE)
+        percentile_80 = RollingFeatureState.rolling(
+            state, 'volatility_quantile', df, "Volatility_Filter",
+            config.VOLATILITY_WINDOW, 'quantile', config.VOLATILITY_PERCENTILE
+        )
         df["High_Volatility"] = df["Volatility_Filter"] > percentile_80
 
         df.dropna(inplace=True)
@@ -279,23 +851,23 @@ class DerivedFeatures:
 # ---------- LABELING FEATURES ----------
 class LabelingFeature:
     @staticmethod
-    def compute_lookahead_period(df: pd.DataFrame, config: StrategyConfig) -> pd.DataFrame:
+    def compute_lookahead_period(df: pd.DataFrame, config: StrategyConfig, state: Optional[RollingFeatureState] = None) -> pd.DataFrame:
         logger.info("Computing lookahead period (ATR-based)...")
         window = config.Lookahead_window
 
-        df['ATR_Percentile'] = df['ATR'].rolling(window=window).rank(pct=True)
+        df['ATR_Percentile'] = RollingFeatureState.rolling(state, 'atr_rank', df, 'ATR', window, 'rank')
         df.dropna(subset=['ATR_Percentile'], inplace=True)
         df['Lookahead_Period'] = np.clip(((df['ATR_Percentile'] * 7) + 7).round(), 7, 14).astype(int)
         df.drop(columns=['ATR_Percentile'], inplace=True)
         return df
 
     @staticmethod
-    def compute_market_structure(df: pd.DataFrame, config: StrategyConfig) -> pd.DataFrame:
+    def compute_market_structure(df: pd.DataFrame, config: StrategyConfig, state: Optional[RollingFeatureState] = None) -> pd.DataFrame:
         logger.info("Computing market structure (Support/Resistance)...")
         window = config.Lookahead_window
 
-        df['Rolling_High'] = df['high'].rolling(window=window).max()
-        df['Rolling_Low'] = df['low'].rolling(window=window).min()
+        df['Rolling_High'] = RollingFeatureState.rolling(state, 'high_max', df, 'high', window, 'max')
+        df['Rolling_Low'] = RollingFeatureState.rolling(state, 'low_min', df, 'low', window, 'min')
 
         df['Support_Level'] = df['Rolling_Low'].rolling(window=window).mean()
         df['Resistance_Level'] = df['Rolling_High'].rolling(window=window).mean()
@@ -310,12 +882,12 @@ class LabelingFeature:
         return df
 
     @staticmethod
-    def compute_momentum_features(df: pd.DataFrame, config: StrategyConfig) -> pd.DataFrame:
+    def compute_momentum_features(df: pd.DataFrame, config: StrategyConfig, state: Optional[RollingFeatureState] = None) -> pd.DataFrame:
         logger.info("Computing momentum-based features...")
         window = config.Lookahead_window
 
         df['ROC'] = df['close'].pct_change(periods=window) * 100  # No fillna
-        df['Momentum_Percentile'] = df['ROC'].rolling(window=window).rank(pct=True)
+        df['Momentum_Percentile'] = RollingFeatureState.rolling(state, 'momentum_rank', df, 'ROC', window, 'rank')
 
         df['Momentum_Confirm'] = np.where(
             df['Momentum_Percentile'] >= 0.80, 1,
@@ -337,6 +909,57 @@ class LabelingFeature:
         return df
 
 
+# ---------- SENTIMENT FEATURE ----------
+class SentimentFeature:
+    BUCKET = '5min'
+    NEUTRAL_SCORE = 50.0
+    SCORE_FIELD = "normalized_overall_weighted_sentiment_score"
+
+    @staticmethod
+    def to_series(sentiment_data: dict) -> pd.Series:
+        """
+        Converts the sentiment API response (a dict keyed by 5-min bucket ISO time)
+        into a float Series indexed by bucket timestamp.
+        """
+        if not sentiment_data:
+            return pd.Series(dtype=float)
+        keys = list(sentiment_data.keys())
+        scores = [
+            obj.get(SentimentFeature.SCORE_FIELD, SentimentFeature.NEUTRAL_SCORE) if isinstance(obj, dict) else None
+            for obj in sentiment_data.values()
+        ]
+        series = pd.Series(scores, index=pd.to_datetime(keys), dtype=float)
+        return series[~series.index.duplicated(keep='last')].sort_index()
+
+    @staticmethod
+    def fetch_sentiment_series(last_ts: pd.Timestamp) -> pd.Series:
+        """
+        Retrieves the sentiment buckets ending at last_ts from the sentiment API.
+        """
+        try:
+            sentiment_response = requests.get(
+                SENTIMENT_API_URL,
+                params={"timestamp": last_ts.isoformat()}
+            )
+            if sentiment_response.status_code == 200:
+                return SentimentFeature.to_series(sentiment_response.json())
+            logger.warning(f"Error calling sentiment API: {sentiment_response.text}")
+        except Exception as e:
+            logger.error(f"Failed to fetch sentiment data: {e}")
+        return pd.Series(dtype=float)
+
+    @staticmethod
+    def attach_sentiment(df: pd.DataFrame, config: StrategyConfig, sentiment: pd.Series) -> pd.DataFrame:
+        """
+        Adds a 'sentiment' column by joining every candle to its 5-minute bucket.
+        Candles without a bucket get the neutral score.
+        """
+        logger.info("Attaching sentiment...")
+        buckets = df["timestamp"].dt.floor(SentimentFeature.BUCKET)
+        df["sentiment"] = buckets.map(sentiment).fillna(SentimentFeature.NEUTRAL_SCORE).astype(float)
+        return df
+
+
 # ---------- CANDLE LABELING ----------
 class CandelLabeling:
     @staticmethod
@@ -410,7 +1033,7 @@ class CandelLabeling:
 class AIModel:
     def __init__(self, config: StrategyConfig):
         self.config = config
-        self.client = MongoClient(self.config.mongo_uri)
+        self.client = MongoClientPool.get(self.config.mongo_uri)
         self.db = self.client[self.config.db_name]
         self.collection = self.db[self.config.collection_name]
 
@@ -516,9 +1139,10 @@ def user_trade_close(symbol, direction, reason):
 class TradingSimulation:
     def __init__(self, config: StrategyConfig):
         self.config = config
-        self.client = MongoClient(self.config.mongo_uri)
+        self.client = MongoClientPool.get(self.config.mongo_uri)
         self.db = self.client[self.config.db_name]
         self.trades_collection = self.db[self.config.collection_name]
+        MongoClientPool.ensure_trade_indexes(self.trades_collection)
 
         self.symbol = self.config.SYMBOL
         self.initial_balance = self.config.initial_balance
@@ -526,6 +1150,10 @@ class TradingSimulation:
 
         self._resume_risk_from_last_trade()
 
+        # Running performance stats; checked against the full history once at startup
+        self.trade_analysis = TradeAnalysys(self.db, self.config)
+        self.trade_analysis.verify()
+
     def filter_signal(self, row) -> bool:
         return True
 
@@ -650,8 +1278,7 @@ class TradingSimulation:
 
         user_trade_close(symbol, direction, reason)
         self.update_investment_per_trade(reason)
-        trade_analysis = TradeAnalysys(self.db, self.config)
-        trade_analysis.analyze_and_store()
+        self.trade_analysis.record_closed_trade({**open_trade, **update_data})
 
     def check_sl_tp(self, open_trade, row):
         direction = open_trade["direction"]
@@ -737,70 +1364,86 @@ class TradingSimulation:
 
 # ---------- TRADE ANALYSIS ----------
 class TradeAnalysys:
+    """
+    Per-bot performance stats kept as running aggregates (counts, sums,
+    streaks, fees) in the Analysis_<symbol> document, so each close costs
+    O(1). analyze_and_store() recomputes everything from the trade history
+    and verify() checks the running state against that full recompute.
+    """
+    METRIC_TOLERANCE = 1e-6
+
     def __init__(self, db, config: StrategyConfig):
         self.db = db
         self.config = config
         self.trades_collection = db[self.config.collection_name]
         self.analysis_collection = db[f"Analysis_{self.config.collection_name}"]
 
-    def analyze_and_store(self):
-        closed_trades_cursor = self.trades_collection.find(
-            {"status": {"$ne": "OPEN"}}
-        ).sort("exit_time", 1)
-        closed_trades = list(closed_trades_cursor)
-
-        if not closed_trades:
-            logger.info("No closed trades yet. Skipping analysis.")
-            return
-
-        total_trades = len(closed_trades)
-        winners = [t for t in closed_trades if t["status"] == "TP"]
-        losers  = [t for t in closed_trades if t["status"] == "SL"]
-
-        winning_trades = len(winners)
-        losing_trades  = len(losers)
-
-        max_winning_streak = 0
-        max_losing_streak  = 0
-        current_win_streak = 0
-        current_loss_streak = 0
+    @staticmethod
+    def empty_state() -> dict:
+        return {
+            "total_trades": 0,
+            "winning_trades": 0,
+            "losing_trades": 0,
+            "current_win_streak": 0,
+            "current_loss_streak": 0,
+            "max_winning_streak": 0,
+            "max_losing_streak": 0,
+            "sum_net_pnl": 0,
+            "sum_profit": 0,
+            "sum_win_net_pnl": 0,
+            "sum_loss_net_pnl": 0,
+            "total_fees_paid": 0,
+            "last_trade_id": None
+        }
 
-        for trade in closed_trades:
-            if trade["status"] == "TP":
-                current_win_streak += 1
-                max_winning_streak = max(max_winning_streak, current_win_streak)
-                current_loss_streak = 0
-            elif trade["status"] == "SL":
-                current_loss_streak += 1
-                max_losing_streak = max(max_losing_streak, current_loss_streak)
-                current_win_streak = 0
-            else:
-                current_win_streak = 0
-                current_loss_streak = 0
-
-        sum_net_pnl = sum(t.get("net_pnl", 0) for t in closed_trades)
-        sum_profit  = sum(t.get("pnl", 0) for t in closed_trades)
-        avg_profit = np.mean([t["net_pnl"] for t in winners]) if winning_trades > 0 else 0.0
-        avg_loss   = np.mean([t["net_pnl"] for t in losers]) if losing_trades > 0 else 0.0
-        total_fees_paid = sum(t.get("total_fees", 0) for t in closed_trades)
+    @staticmethod
+    def apply_trade(state: dict, trade: dict) -> dict:
+        """Fold one closed trade into the running state (in exit_time order)."""
+        state["total_trades"] += 1
+        if trade["status"] == "TP":
+            state["winning_trades"] += 1
+            state["sum_win_net_pnl"] += trade["net_pnl"]
+            state["current_win_streak"] += 1
+            state["max_winning_streak"] = max(state["max_winning_streak"], state["current_win_streak"])
+            state["current_loss_streak"] = 0
+        elif trade["status"] == "SL":
+            state["losing_trades"] += 1
+            state["sum_loss_net_pnl"] += trade["net_pnl"]
+            state["current_loss_streak"] += 1
+            state["max_losing_streak"] = max(state["max_losing_streak"], state["current_loss_streak"])
+            state["current_win_streak"] = 0
+        else:
+            state["current_win_streak"] = 0
+            state["current_loss_streak"] = 0
+        state["sum_net_pnl"] += trade.get("net_pnl", 0)
+        state["sum_profit"] += trade.get("pnl", 0)
+        state["total_fees_paid"] += trade.get("total_fees", 0)
+        state["last_trade_id"] = trade.get("_id")
+        return state
+
+    def metrics(self, state: dict) -> dict:
+        winning_trades = state["winning_trades"]
+        losing_trades = state["losing_trades"]
+        avg_profit = state["sum_win_net_pnl"] / winning_trades if winning_trades > 0 else 0.0
+        avg_loss   = state["sum_loss_net_pnl"] / losing_trades if losing_trades > 0 else 0.0
         break_even_win_rate = 100 * (1 / (1 + self.config.reward_to_risk_ratio))
-        win_rate = (winning_trades / total_trades) * 100.0
+        win_rate = (winning_trades / state["total_trades"]) * 100.0
 
         initial_balance = self.config.initial_balance
-        net_balance = initial_balance + sum_net_pnl
-        balance     = initial_balance + sum_profit
+        net_balance = initial_balance + state["sum_net_pnl"]
+        balance     = initial_balance + state["sum_profit"]
         roi         = ((net_balance - initial_balance) / initial_balance) * 100.0
 
-        analysis_result = {
+        return {
             "timestamp": datetime.now(),
-            "Total Trades": total_trades,
+            "Total Trades": state["total_trades"],
             "Winning Trades": winning_trades,
             "Losing Trades": losing_trades,
-            "Max Winning Streak": int(max_winning_streak),
-            "Max Losing Streak": int(max_losing_streak),
+            "Max Winning Streak": int(state["max_winning_streak"]),
+            "Max Losing Streak": int(state["max_losing_streak"]),
             "Avg Profit Per Trade": float(avg_profit),
             "Avg Loss Per Trade": float(avg_loss),
-            "Total Fees Paid": float(total_fees_paid),
+            "Total Fees Paid": float(state["total_fees_paid"]),
             "Break-even Win Rate (%)": float(break_even_win_rate),
             "Win Rate (%)": float(win_rate),
             "ROI (%)": float(roi),
@@ -808,43 +1451,86 @@ class TradeAnalysys:
             "Final Balance": float(balance)
         }
 
+    def store(self, state: dict):
         self.analysis_collection.update_one(
             {"analysis_id": 1},
-            {"$set": analysis_result},
+            {"$set": {**self.metrics(state), "state": state}},
             upsert=True
         )
-        # logger.info(f"Trade Analysis stored: {analysis_result}")
+
+    def full_state(self) -> Optional[dict]:
+        closed_trades = self.trades_collection.find(
+            {"status": {"$ne": "OPEN"}}
+        ).sort("exit_time", 1)
+        state = self.empty_state()
+        for trade in closed_trades:
+            self.apply_trade(state, trade)
+        return state if state["total_trades"] else None
+
+    def analyze_and_store(self) -> Optional[dict]:
+        """Full recompute from every closed trade; also rebuilds the running state."""
+        state = self.full_state()
+        if state is None:
+            logger.info("No closed trades yet. Skipping analysis.")
+            return None
+        self.store(state)
+        return state
+
+    def record_closed_trade(self, trade: dict):
+        """O(1) update for one newly closed trade."""
+        doc = self.analysis_collection.find_one({"analysis_id": 1}, {"state": 1})
+        state = doc.get("state") if doc else None
+        if state is None:
+            # No running state yet (first close, or written by an older version)
+            self.analyze_and_store()
+            return
+        if trade.get("_id") is not None and state.get("last_trade_id") == trade.get("_id"):
+            return
+        self.store(self.apply_trade(state, trade))
+
+    def verify(self, repair: bool = True) -> bool:
+        """Compare the running state with a full recompute; optionally repair."""
+        doc = self.analysis_collection.find_one({"analysis_id": 1}, {"state": 1})
+        stored = doc.get("state") if doc else None
+        full = self.full_state()
+        if full is None or stored is None:
+            ok = full is None and stored is None
+        else:
+            ok = all(
+                math.isclose(stored.get(k, 0), v, rel_tol=self.METRIC_TOLERANCE, abs_tol=self.METRIC_TOLERANCE)
+                for k, v in full.items() if k != "last_trade_id"
+            )
+        if not ok:
+            logger.warning(f"[{self.config.SYMBOL}] Trade analysis state drifted from history" + ("; rebuilding." if repair else "."))
+            if repair and full is not None:
+                self.store(full)
+        return ok
 
 
 # ---------- LIVE TRADING LOOP ----------
 def run_live_trading(config: StrategyConfig):
     ai_model = AIModel(config)
     trading_sim = TradingSimulation(config)
+    candle_store = CandleStore(config)
+    indicator_engine = IndicatorEngine(config)
+    feature_state = RollingFeatureState()
     tf_minutes = MarketDataFetcher.timeframe_to_minutes(config.TIMEFRAME)
-    last_processed_ts = None
 
     while True:
         MarketDataFetcher.sleep_until_candle_close(tf_minutes)
 
-        df = MarketDataFetcher.fetch_binance_futures_ohlcv(
-            symbol=config.SYMBOL,
-            timeframe=config.TIMEFRAME,
-            limit=config.LIMIT,
-            last_known_ts=last_processed_ts
-        )
+        df = candle_store.refresh()
 
         if df is None or df.empty:
             logger.warning("No data fetched. Skipping iteration.")
             continue
 
-        last_processed_ts = df.iloc[-1]["timestamp"]
-
         # Pipeline: Calculate indicators and features
-        df = TechnicalIndicators.calculate_indicators(df, config)
-        df = DerivedFeatures.calculate_features(df, config)
-        df = LabelingFeature.compute_lookahead_period(df, config)
-        df = LabelingFeature.compute_market_structure(df, config)
-        df = LabelingFeature.compute_momentum_features(df, config)
+        df = TechnicalIndicators.calculate_indicators_incremental(df, config, indicator_engine)
+        df = DerivedFeatures.calculate_features(df, config, feature_state)
+        df = LabelingFeature.compute_lookahead_period(df, config, feature_state)
+        df = LabelingFeature.compute_market_structure(df, config, feature_state)
+        df = LabelingFeature.compute_momentum_features(df, config, feature_state)
         df = LabelingFeature.compute_lorentzian_distance(df, config)
         df = CandelLabeling.label_candles(df, config)
 
@@ -852,41 +1538,10 @@ def run_live_trading(config: StrategyConfig):
         df = df.tail(1000)
 
         # 2) Retrieve sentiment once for the last row's timestamp
-        last_ts = df.iloc[-1]["timestamp"]
-        try:
-            sentiment_response = requests.get(
-                SENTIMENT_API_URL,
-                params={"timestamp": last_ts.isoformat()}
-            )
-            if sentiment_response.status_code == 200:
-                sentiment_data = sentiment_response.json()  # A dict keyed by 5-min bucket ISO time.
-            else:
-                logger.warning(f"Error calling sentiment API: {sentiment_response.text}")
-                sentiment_data = {}
-        except Exception as e:
-            logger.error(f"Failed to fetch sentiment data: {e}")
-            sentiment_data = {}
-
-        # 3) Append 'sentiment' column and map each row's timestamp to the 5-minute bucket
-        df["sentiment"] = np.nan
-
-        for idx in df.index:
-            row_time = df.loc[idx, "timestamp"]
-            # Round down to the nearest 5-minute bucket for consistent lookup
-            row_floor = row_time.replace(second=0, microsecond=0)
-            minute_bucket = (row_floor.minute // 5) * 5
-            row_bucket = row_floor.replace(minute=minute_bucket)
-
-            # Convert to ISO to match keys in sentiment_data
-            bucket_key = row_bucket.isoformat()
-
-            # We read the field "normalized_overall_weighted_sentiment_score" if available.
-            if bucket_key in sentiment_data:
-                sentiment_obj = sentiment_data[bucket_key]
-                score = sentiment_obj.get("normalized_overall_weighted_sentiment_score", 50)
-                df.loc[idx, "sentiment"] = score
-            else:
-                df.loc[idx, "sentiment"] = 50.0
+        sentiment = SentimentFeature.fetch_sentiment_series(df.iloc[-1]["timestamp"])
+
+        # 3) Append 'sentiment' column by mapping each row's timestamp to its 5-minute bucket
+        df = SentimentFeature.attach_sentiment(df, config, sentiment)
 
         # 4) Train AI model & get prediction
         df = ai_model.train_and_predict(df)
@@ -917,6 +1572,10 @@ if __name__ == "__main__":
         StrategyConfig(SYMBOL='1000PEPE/USDT', TIMEFRAME='5m')
     ]
 
+    # Build indexes before any trading thread starts querying
+    for conf in configs:
+        MongoClientPool.ensure_trade_indexes(MongoClientPool.get(conf.mongo_uri)[conf.db_name][conf.collection_name])
+
     trading_threads = []
     for conf in configs:
         t = threading.Thread(target=run_live_trading, args=(conf,), daemon=True)
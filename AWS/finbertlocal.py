@@ -14,6 +14,9 @@ import torch
 import scipy
 from transformers import AutoTokenizer, AutoModelForSequenceClassification
 
+from tweet_log import TweetLog
+from tweet_buffer import TweetBuffer, to_epoch_us
+
 # Configure logging
 logging.basicConfig(
     level=logging.DEBUG,
@@ -23,7 +26,11 @@ logging.basicConfig(
 
 # Filenames
 COOKIES_FILE = "twitter_cookies.json"
-TWEETS_FILE = "tweets.json"
+TWEETS_FILE = "tweets.json"   # legacy JSON array, migrated into TWEETS_LOG once
+TWEETS_LOG = "tweets.jsonl"   # append-only log, one tweet per line
+
+# Tweets per padded FinBERT batch
+FINBERT_BATCH_SIZE = 32
 
 # Local model folder path
 local_model_path = "./finbert_local"
@@ -45,21 +52,52 @@ else:
 # Initialize Flask app
 app = Flask(__name__)
 
-# In-memory tweets store (populated if scraping runs)
-tweets_db = []
-
-def predict_sentiment(text):
-    """Predict sentiment using FinBERT."""
-    tokenizer_kwargs = {"padding": True, "truncation": True, "max_length": 512}
-    with torch.no_grad():
-        inputs = finbert_tokenizer(text, return_tensors="pt", **tokenizer_kwargs)
-        logits = finbert_model(**inputs).logits
-        probabilities = scipy.special.softmax(logits.numpy().squeeze())
-        scores = { label: prob for label, prob in zip(finbert_model.config.id2label.values(), probabilities) }
-    sentiment = max(scores, key=scores.get)
-    probability = max(scores.values())
-    logging.debug(f"Predicted sentiment for text: '{text[:30]}...' -> {sentiment} ({probability:.2f})")
-    return sentiment, float(probability)
+# In-memory tweets store (populated if scraping runs), kept in timestamp order
+# and bounded so memory stays flat; 30 days covers the longest timeframe served
+TWEETS_DB_MAX_AGE = timedelta(days=30)
+TWEETS_DB_MAX_COUNT = 50000
+tweets_db = TweetBuffer(TWEETS_DB_MAX_AGE, TWEETS_DB_MAX_COUNT)
+
+# Stored tweets live in an append-only log instead of a rewritten JSON array
+tweet_log = TweetLog(TWEETS_LOG)
+tweet_log.migrate_json(TWEETS_FILE)
+
+def tweet_identity(tweet):
+    """(user, text) is the duplicate key for stored tweets."""
+    return tweet.get("user"), tweet.get("text")
+
+# Keys of every stored tweet, so appends don't have to reread the log
+stored_keys = {tweet_identity(t) for t in tweet_log.read_all() if "user" in t and "text" in t}
+
+def predict_sentiment_batch(texts, batch_size=FINBERT_BATCH_SIZE):
+    """
+    Predict sentiment for many texts at once. Texts are sorted by token count
+    so each padded batch stays short; results are returned in input order.
+    """
+    if not texts:
+        return []
+    input_ids = finbert_tokenizer(texts, truncation=True, max_length=512)["input_ids"]
+    order = sorted(range(len(texts)), key=lambda i: len(input_ids[i]))
+    labels = list(finbert_model.config.id2label.values())
+    results = [None] * len(texts)
+    with torch.inference_mode():
+        for start in range(0, len(order), batch_size):
+            chunk = order[start:start + batch_size]
+            inputs = finbert_tokenizer.pad({"input_ids": [input_ids[i] for i in chunk]}, return_tensors="pt")
+            probabilities = scipy.special.softmax(finbert_model(**inputs).logits.numpy(), axis=-1)
+            for i, probs in zip(chunk, probabilities):
+                best = int(probs.argmax())
+                results[i] = (labels[best], float(probs[best]))
+    logging.debug(f"Predicted sentiment for {len(texts)} texts in {-(-len(texts) // batch_size)} batches")
+    return results
+
+def score_tweets(tweets):
+    """Fill in sentiment fields for a list of scraped tweets with one batched call."""
+    scores = predict_sentiment_batch([t["text"] for t in tweets])
+    for tweet, (sentiment, sentiment_probability) in zip(tweets, scores):
+        tweet["sentiment"] = sentiment
+        tweet["sentiment_probability"] = sentiment_probability
+    return tweets
 
 def load_cookies(driver, cookie_file=COOKIES_FILE):
     """Load cookies from a file and add to the driver."""
@@ -98,8 +136,8 @@ def manual_login_and_save_cookies(driver, cookie_file=COOKIES_FILE):
 
 def scrape_latest_tweets(driver, account, max_tweets=5):
     """
-    Scrape latest tweets from an account and calculate sentiment.
-    Returns a list of tweet dictionaries.
+    Scrape latest tweets from an account.
+    Returns a list of tweet dictionaries without sentiment; see score_tweets.
     """
     url = f"https://x.com/search?q=from%3A{account}&f=live"
     logging.info(f"Scraping URL: {url}")
@@ -132,7 +170,6 @@ def scrape_latest_tweets(driver, account, max_tweets=5):
             except NoSuchElementException:
                 comments = "0"
 
-            sentiment, sentiment_probability = predict_sentiment(tweet_text)
             tweets_data.append({
                 "user": account,
                 "text": tweet_text,
@@ -140,45 +177,40 @@ def scrape_latest_tweets(driver, account, max_tweets=5):
                 "likes": likes,
                 "retweets": retweets,
                 "comments": comments,
-                "timestamp": datetime.utcnow().isoformat(),
-                "sentiment": sentiment,
-                "sentiment_probability": sentiment_probability
+                "timestamp": datetime.utcnow().isoformat()
             })
         logging.info(f"Scraped {len(tweets_data)} tweets for account: {account}")
     except Exception as e:
         logging.error(f"Error scraping tweets for {account}: {e}")
     return tweets_data
 
-def append_new_tweets(new_tweets, json_file=TWEETS_FILE):
-    """Append new tweets to the stored tweets JSON file."""
-    if os.path.exists(json_file):
-        with open(json_file, "r", encoding="utf-8") as f:
-            existing = json.load(f)
-    else:
-        existing = []
+def append_new_tweets(new_tweets, log=tweet_log):
+    """Append tweets that aren't stored yet to the tweet log."""
     # Use (user, text) as unique key
-    existing_set = {(t["user"], t["text"]) for t in existing if "user" in t and "text" in t}
-    added = [nt for nt in new_tweets if (nt["user"], nt["text"]) not in existing_set]
+    added = []
+    for nt in new_tweets:
+        key = tweet_identity(nt)
+        if key not in stored_keys:
+            stored_keys.add(key)
+            added.append(nt)
     if added:
-        existing.extend(added)
+        log.append(added)
         logging.info(f"Added {len(added)} new tweets.")
     else:
         logging.info("No new tweets to add.")
-    with open(json_file, "w", encoding="utf-8") as f:
-        json.dump(existing, f, indent=2)
 
 # ----------------- API Endpoints -----------------
 
 @app.route('/get_recent_tweets', methods=['GET'])
 def get_recent_tweets():
     cutoff = datetime.utcnow() - timedelta(minutes=10)
-    recent = [t for t in tweets_db if datetime.fromisoformat(t["timestamp"]) > cutoff]
+    recent = tweets_db.since(cutoff)
     return jsonify(recent), 200
 
 @app.route('/get_sentiments', methods=['GET'])
 def get_sentiments():
     counts = {}
-    for t in tweets_db:
+    for t in tweets_db.all():
         counts[t.get("sentiment", "unknown")] = counts.get(t.get("sentiment", "unknown"), 0) + 1
     return jsonify(counts), 200
 
@@ -196,7 +228,7 @@ def get_time_range_from_request():
 @app.route('/get_equal_sentiment', methods=['GET'])
 def get_equal_sentiment():
     start, end = get_time_range_from_request()
-    filtered = [t for t in tweets_db if start <= datetime.fromisoformat(t["timestamp"]) <= end]
+    filtered = tweets_db.between(start, end)
     counts = {}
     for t in filtered:
         counts[t.get("sentiment", "unknown")] = counts.get(t.get("sentiment", "unknown"), 0) + 1
@@ -211,14 +243,15 @@ def get_equal_sentiment():
 def get_weighted_sentiment():
     start, end = get_time_range_from_request()
     total_sec = (end - start).total_seconds()
-    filtered = [t for t in tweets_db if start <= datetime.fromisoformat(t["timestamp"]) <= end]
+    items = tweets_db.items_between(start, end)
+    filtered = [t for _, t in items]
     weighted = {"positive": 0, "neutral": 0, "negative": 0}
     overall_score = 0.0
     total_weight = 0.0
     sentiment_map = {"positive": 1, "neutral": 0, "negative": -1}
-    for t in filtered:
-        t_time = datetime.fromisoformat(t["timestamp"])
-        weight = ((t_time - start).total_seconds() / total_sec) if total_sec > 0 else 1
+    start_us = to_epoch_us(start)
+    for t_us, t in items:
+        weight = (((t_us - start_us) / 1e6) / total_sec) if total_sec > 0 else 1
         weighted[t.get("sentiment", "neutral")] += weight
         overall_score += sentiment_map.get(t.get("sentiment", "neutral"), 0) * t.get("sentiment_probability", 0) * weight
         total_weight += weight
@@ -236,7 +269,7 @@ def get_weighted_sentiment():
 def get_all_sentiment_scores():
     sentiment_map = {"positive": 1, "neutral": 0, "negative": -1}
     scores = []
-    for t in tweets_db:
+    for t in tweets_db.all():
         val = sentiment_map.get(t.get("sentiment", "neutral"), 0)
         comp = val * t.get("sentiment_probability", 0)
         scores.append({
@@ -259,7 +292,7 @@ def get_sentiments_timeframe(timeframe):
         start = now - timedelta(days=30)
     else:
         return jsonify({"error": "Unsupported timeframe. Use today, week, or month."}), 400
-    filtered = [t for t in tweets_db if start <= datetime.fromisoformat(t["timestamp"]) <= now]
+    filtered = tweets_db.between(start, now)
     counts = {}
     for t in filtered:
         counts[t.get("sentiment", "unknown")] = counts.get(t.get("sentiment", "unknown"), 0) + 1
@@ -275,15 +308,11 @@ def get_sentiments_timeframe(timeframe):
 @app.route('/get_weighted_sentiment_all', methods=['GET'])
 def get_weighted_sentiment_all():
     try:
-        if not os.path.exists(TWEETS_FILE):
-            logging.error("tweets.json not found.")
-            return jsonify({"error": "No tweets stored"}), 404
-        with open(TWEETS_FILE, "r", encoding="utf-8") as f:
-            stored = json.load(f)
+        stored = tweet_log.read_all()
         if not stored:
-            logging.error("tweets.json is empty.")
+            logging.error(f"{TWEETS_LOG} is empty.")
             return jsonify({"error": "No tweets available"}), 404
-        logging.debug(f"Loaded {len(stored)} tweets from {TWEETS_FILE}")
+        logging.debug(f"Loaded {len(stored)} tweets from {TWEETS_LOG}")
         # Sort by timestamp
         sorted_tweets = sorted(stored, key=lambda t: datetime.fromisoformat(t["timestamp"]))
         start = datetime.fromisoformat(sorted_tweets[0]["timestamp"])
@@ -340,13 +369,18 @@ def main():
     logging.info("Starting scraping loop. Press Ctrl+C to stop.")
     try:
         while True:
+            cycle_tweets = []
             for account in accounts:
                 logging.info(f"Scraping tweets for: {account}")
-                new_tweets = scrape_latest_tweets(driver, account, max_tweets=5)
-                append_new_tweets(new_tweets, TWEETS_FILE)
-                tweets_db.extend(new_tweets)
+                cycle_tweets.extend(scrape_latest_tweets(driver, account, max_tweets=5))
                 logging.debug("Sleeping 10 seconds...")
                 time.sleep(10)
+            # Score the whole cycle in batches, then store it
+            score_tweets(cycle_tweets)
+            append_new_tweets(cycle_tweets)
+            tweets_db.extend(cycle_tweets)
+            tweet_log.sync()
+            tweet_log.maybe_compact(key=tweet_identity)
             logging.info("Cycle complete. Sleeping 5 minutes...")
             time.sleep(5 * 60)
     except KeyboardInterrupt:
@@ -7,7 +7,8 @@ Twitter Sentiment Scraper – 15‑day window + auto‑cookie refresh
   restart the script without logging in again.
 """
 
-import json, os, time, random, logging, threading
+import json, os, time, random, logging, threading, sqlite3, hashlib, queue
+from collections import OrderedDict
 from datetime import datetime, timedelta, timezone
 from typing import List, Dict, Tuple, Optional
 
@@ -21,15 +22,28 @@ from selenium.common.exceptions import (
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
+from tweet_log import TweetLog
+from tweet_buffer import TweetBuffer
+
 # ───────────────────────── CONFIG ──────────────────────────
 COOKIES_FILE         = "twitter_cookies.json"
-HISTORY_TWEETS_FILE  = "historytweets.json"
+HISTORY_TWEETS_FILE  = "historytweets.json"    # legacy JSON array, migrated once
+HISTORY_TWEETS_LOG   = "historytweets.jsonl"   # append-only log, one tweet per line
+SENTIMENT_CACHE_FILE = "sentiment_cache.db"
+SCRAPE_LEDGER_FILE   = "scrape_ledger.json"
 
 MAX_DAYS_BACK        = 15             # ← scrape this many days
 SCRAPE_CYCLE_SECONDS = 600            # 10‑min pause between cycles
-ACCOUNT_PAUSE_RANGE  = (4, 9)         # seconds between accounts
-DAY_PAUSE_RANGE      = (5, 10)        # seconds between day windows
+ACCOUNT_PAUSE_RANGE  = (4, 9)         # seconds before a worker switches account
+DAY_PAUSE_RANGE      = (5, 10)        # seconds between a worker's day windows
+SCRAPER_WORKERS      = 3              # logged-in Chrome drivers scraping in parallel
+GLOBAL_SEARCH_GAP    = 2.0            # min seconds between any two searches, all workers
+ALWAYS_RESCRAPE_DAYS = 2              # today + yesterday are scraped every cycle
+OLD_DAY_REFRESH_SECS = 24 * 3600      # older complete days are refreshed this often (±25 %)
 MAX_TWEETS_PER_DAY   = 20
+FINBERT_BATCH_SIZE   = 32             # tweets per padded FinBERT batch
+SENTIMENT_CACHE_SIZE = 20_000         # scores kept in memory in front of SQLite
+TWEETS_DB_MAX_COUNT  = 50_000         # in-memory tweets kept for the endpoints
 
 HEADLESS_SCRAPE      = False           # False = watch Chrome UI
 
@@ -59,7 +73,8 @@ logging.info("FinBERT ready.")
 
 # ───────────────────────── FLASK APP ───────────────────────
 app = Flask(__name__)
-tweets_db: List[Dict] = []
+# Time-ordered and bounded: only the scrape window is kept in memory
+tweets_db = TweetBuffer(timedelta(days=MAX_DAYS_BACK + 1), TWEETS_DB_MAX_COUNT)
 
 # ─────────────────── SELENIUM HELPERS ──────────────────────
 def _build_driver(headless: bool = HEADLESS_SCRAPE) -> uc.Chrome:
@@ -121,15 +136,140 @@ def get_logged_in_driver() -> uc.Chrome:
             refresh_cookies_via_manual_login()
     raise RuntimeError("Could not establish logged‑in session.")
 
+# ───────────────────── SENTIMENT CACHE ─────────────────────
+class SentimentCache:
+    """text sha256 → (label, probability), persisted in SQLite with an LRU
+    dict in front. Also remembers which tweets already went to
+    the history log, so a rescrape of the same window adds nothing."""
+
+    _SQL_CHUNK = 500   # stay well below SQLite's bound-parameter limit
+
+    def __init__(self, path: str = SENTIMENT_CACHE_FILE, memory_size: int = SENTIMENT_CACHE_SIZE):
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("CREATE TABLE IF NOT EXISTS sentiment ("
+                         "text_hash TEXT PRIMARY KEY, label TEXT NOT NULL, probability REAL NOT NULL)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS seen_tweets (tweet_key TEXT PRIMARY KEY)")
+        self._db.commit()
+        self._memory: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._memory_size = memory_size
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def text_hash(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def tweet_key(tweet: Dict) -> str:
+        ident = "\x1f".join(str(tweet.get(k, "")) for k in ("user", "timestamp", "text"))
+        return hashlib.sha256(ident.encode("utf-8")).hexdigest()
+
+    def _remember(self, text_hash: str, score: Tuple[str, float]) -> None:
+        self._memory[text_hash] = score
+        self._memory.move_to_end(text_hash)
+        if len(self._memory) > self._memory_size:
+            self._memory.popitem(last=False)
+
+    def _select(self, table: str, column: str, keys: List[str]) -> List[tuple]:
+        rows = []
+        for i in range(0, len(keys), self._SQL_CHUNK):
+            chunk = keys[i:i + self._SQL_CHUNK]
+            marks = ",".join("?" * len(chunk))
+            rows.extend(self._db.execute(
+                f"SELECT * FROM {table} WHERE {column} IN ({marks})", chunk).fetchall())
+        return rows
+
+    def get_many(self, text_hashes: List[str]) -> Dict[str, Tuple[str, float]]:
+        found: Dict[str, Tuple[str, float]] = {}
+        with self._lock:
+            missing = []
+            for h in dict.fromkeys(text_hashes):
+                if h in self._memory:
+                    self._memory.move_to_end(h)
+                    found[h] = self._memory[h]
+                else:
+                    missing.append(h)
+            for h, label, prob in self._select("sentiment", "text_hash", missing):
+                found[h] = (label, prob)
+                self._remember(h, found[h])
+        return found
+
+    def put_many(self, scores: Dict[str, Tuple[str, float]]) -> None:
+        with self._lock:
+            self._db.executemany("INSERT OR REPLACE INTO sentiment VALUES (?, ?, ?)",
+                                 [(h, label, prob) for h, (label, prob) in scores.items()])
+            self._db.commit()
+            for h, score in scores.items():
+                self._remember(h, score)
+
+    def unseen(self, tweets: List[Dict]) -> List[Dict]:
+        """Tweets not yet written to the history file (first copy of in-batch repeats)."""
+        keys = [self.tweet_key(t) for t in tweets]
+        with self._lock:
+            seen = {row[0] for row in self._select("seen_tweets", "tweet_key", list(set(keys)))}
+        fresh = []
+        for key, tweet in zip(keys, tweets):
+            if key not in seen:
+                seen.add(key)
+                fresh.append(tweet)
+        return fresh
+
+    def mark_seen(self, tweets: List[Dict]) -> None:
+        with self._lock:
+            self._db.executemany("INSERT OR IGNORE INTO seen_tweets VALUES (?)",
+                                 [(self.tweet_key(t),) for t in tweets])
+            self._db.commit()
+
+    def has_seen_tweets(self) -> bool:
+        with self._lock:
+            return self._db.execute("SELECT 1 FROM seen_tweets LIMIT 1").fetchone() is not None
+
+tweet_log = TweetLog(HISTORY_TWEETS_LOG)
+tweet_log.migrate_json(HISTORY_TWEETS_FILE)
+
+sentiment_cache = SentimentCache()
+if not sentiment_cache.has_seen_tweets():
+    # First run: everything already in the log counts as written
+    existing = [t for t in tweet_log.read_all() if "text" in t]
+    sentiment_cache.mark_seen(existing)
+    logging.info("🗂️  Seeded sentiment cache with %d existing tweets", len(existing))
+
 # ────────────────────── FINBERT HELPER ─────────────────────
-def predict_sentiment(text: str) -> Tuple[str, float]:
-    with torch.no_grad():
-        inp = finbert_tokenizer(text, return_tensors="pt",
-                                padding=True, truncation=True, max_length=512)
-        probs = scipy.special.softmax(finbert_model(**inp).logits.numpy().squeeze())
-        mapping = {finbert_model.config.id2label[i]: p for i, p in enumerate(probs)}
-    label = max(mapping, key=mapping.get)
-    return label, float(mapping[label])
+def predict_sentiment_batch(texts: List[str],
+                            batch_size: int = FINBERT_BATCH_SIZE) -> List[Tuple[str, float]]:
+    """FinBERT (label, probability) for each text, in input order.
+    Texts are sorted by token count before batching so padding stays short."""
+    if not texts:
+        return []
+    input_ids = finbert_tokenizer(texts, truncation=True, max_length=512)["input_ids"]
+    order = sorted(range(len(texts)), key=lambda i: len(input_ids[i]))
+    id2label = finbert_model.config.id2label
+    results: List[Optional[Tuple[str, float]]] = [None] * len(texts)
+    with torch.inference_mode():
+        for start in range(0, len(order), batch_size):
+            chunk = order[start:start + batch_size]
+            inp = finbert_tokenizer.pad({"input_ids": [input_ids[i] for i in chunk]},
+                                        return_tensors="pt")
+            probs = scipy.special.softmax(finbert_model(**inp).logits.numpy(), axis=-1)
+            for i, p in zip(chunk, probs):
+                best = int(p.argmax())
+                results[i] = (id2label[best], float(p[best]))
+    return results
+
+def score_tweets(tweets: List[Dict]) -> List[Dict]:
+    """Fill in sentiment fields for a whole scrape pass. Texts already in the
+    sentiment cache skip the model; the rest go through one batched call."""
+    hashes = [SentimentCache.text_hash(t["text"]) for t in tweets]
+    scores = sentiment_cache.get_many(hashes)
+    todo = {h: t["text"] for h, t in zip(hashes, tweets) if h not in scores}
+    if todo:
+        fresh = dict(zip(todo, predict_sentiment_batch(list(todo.values()))))
+        sentiment_cache.put_many(fresh)
+        scores.update(fresh)
+    logging.info("🧠 Scored %d tweets (%d cached, %d through FinBERT)",
+                 len(tweets), len(tweets) - len(todo), len(todo))
+    for t, h in zip(tweets, hashes):
+        t["sentiment"], t["sentiment_probability"] = scores[h]
+    return tweets
 
 # ─────────────────────── SCRAPING CORE ─────────────────────
 def _scroll(driver: uc.Chrome, seconds: int = 10):
@@ -145,7 +285,9 @@ def _scroll(driver: uc.Chrome, seconds: int = 10):
 
 def scrape_tweets_advanced(driver: uc.Chrome, account: str,
                            since_date: str, until_date: str,
-                           max_tweets: int = MAX_TWEETS_PER_DAY) -> List[Dict]:
+                           max_tweets: int = MAX_TWEETS_PER_DAY) -> Optional[List[Dict]]:
+    """Tweets come back without sentiment; run score_tweets on the pass.
+    Returns None when the window could not be scraped (error, login wall)."""
     try:
         query = f"from%3A{account}%20since%3A{since_date}%20until%3A{until_date}"
         search_url = f"https://x.com/search?q={query}&f=live"
@@ -162,8 +304,8 @@ def scrape_tweets_advanced(driver: uc.Chrome, account: str,
             page_text = driver.page_source[:500]  # First 500 chars
             if "login" in page_text.lower() or "sign in" in page_text.lower():
                 logging.error("❌ Login wall detected!")
-            else:
-                logging.warning("⚠️  No tweets found for %s (%s → %s)", account, since_date, until_date)
+                return None
+            logging.warning("⚠️  No tweets found for %s (%s → %s)", account, since_date, until_date)
             return []
 
         _scroll(driver, seconds=10)
@@ -190,11 +332,10 @@ def scrape_tweets_advanced(driver: uc.Chrome, account: str,
             try: ts = e.find_element(By.TAG_NAME, "time").get_attribute("datetime")
             except NoSuchElementException: ts = datetime.now(timezone.utc).isoformat()
             
-            sent, prob = predict_sentiment(txt)
             tweet_data = {
                 "user": account, "text": txt, "tweet_id": tid,
                 "likes": likes, "retweets": rts, "comments": cmts,
-                "timestamp": ts, "sentiment": sent, "sentiment_probability": prob,
+                "timestamp": ts,
             }
             tweets.append(tweet_data)
             
@@ -207,45 +348,25 @@ def scrape_tweets_advanced(driver: uc.Chrome, account: str,
         logging.error("❌ Error scraping %s: %s", account, str(e))
         import traceback
         logging.error("❌ Traceback: %s", traceback.format_exc())
-        return []
+        return None
 
-def append_all_tweets(new: List[Dict]):
-    """Save all tweets without checking for duplicates"""
-    logging.info("💾 Attempting to save %d tweets to file: %s", len(new), HISTORY_TWEETS_FILE)
-    
+def append_all_tweets(new: List[Dict]) -> bool:
+    """Append tweets to the history log without checking for duplicates
+    (compaction dedups). Returns True once they are written."""
+    if not new:
+        logging.info("⚠️  No tweets to save")
+        return False
     try:
-        if os.path.exists(HISTORY_TWEETS_FILE):
-            with open(HISTORY_TWEETS_FILE, "r", encoding="utf-8") as fp:
-                old = json.load(fp)
-            logging.info("📂 Loaded %d existing tweets from file", len(old))
-        else:
-            old = []
-            logging.info("📂 No existing file found, starting fresh")
-        
-        # Add all new tweets without duplicate checking
-        if new:
-            old.extend(new)
-            # Create directory if it doesn't exist
-            os.makedirs(os.path.dirname(HISTORY_TWEETS_FILE) if os.path.dirname(HISTORY_TWEETS_FILE) else ".", exist_ok=True)
-            
-            with open(HISTORY_TWEETS_FILE, "w", encoding="utf-8") as fp:
-                json.dump(old, fp, indent=2, ensure_ascii=False)
-                fp.flush()  # Force write to disk
-                
-            # Verify file was written
-            if os.path.exists(HISTORY_TWEETS_FILE):
-                file_size = os.path.getsize(HISTORY_TWEETS_FILE)
-                logging.info("✅ Successfully saved %d new tweets! Total tweets in file: %d (File size: %d bytes)", len(new), len(old), file_size)
-            else:
-                logging.error("❌ File was not created after writing!")
-        else:
-            logging.info("⚠️  No tweets to save")
-            
+        tweet_log.append(new)
+        logging.info("✅ Successfully saved %d new tweets to %s (File size: %d bytes)",
+                     len(new), HISTORY_TWEETS_LOG, os.path.getsize(HISTORY_TWEETS_LOG))
+        return True
     except Exception as e:
         logging.error("❌ Error saving tweets: %s", str(e))
         logging.error("❌ Error type: %s", type(e).__name__)
         import traceback
         logging.error("❌ Traceback: %s", traceback.format_exc())
+        return False
 
 # ─────────────────────── ACCOUNT LIST ──────────────────────
 ACCOUNTS = [
@@ -262,36 +383,210 @@ ACCOUNTS = [
 ]
 
 # ─────────────────── CONTINUOUS SCRAPER ────────────────────
+class ScrapeLedger:
+    """(account, since_date) → when that day window was last fully scraped,
+    how many tweets it had and when it is due again. Persisted as JSON with
+    an atomic replace so a crash can't leave a half-written ledger."""
+
+    def __init__(self, path: str = SCRAPE_LEDGER_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict] = {}
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as fp:
+                    self._entries = json.load(fp)
+            except Exception as exc:
+                logging.warning("Scrape ledger unreadable, starting fresh: %s", exc)
+
+    @staticmethod
+    def _key(account: str, since_date: str) -> str:
+        return f"{account}|{since_date}"
+
+    def is_due(self, account: str, since_date: str, days_back: int) -> bool:
+        if days_back < ALWAYS_RESCRAPE_DAYS:
+            return True
+        with self._lock:
+            entry = self._entries.get(self._key(account, since_date))
+        if entry is None:
+            return True
+        return datetime.now(timezone.utc) >= datetime.fromisoformat(entry["refresh_after"])
+
+    def record(self, account: str, since_date: str, tweet_count: int) -> None:
+        now = datetime.now(timezone.utc)
+        # Jitter so old days don't all come due in the same cycle
+        refresh = timedelta(seconds=OLD_DAY_REFRESH_SECS * random.uniform(0.75, 1.25))
+        with self._lock:
+            self._entries[self._key(account, since_date)] = {
+                "scraped_at": now.isoformat(),
+                "tweets": tweet_count,
+                "refresh_after": (now + refresh).isoformat(),
+            }
+
+    def save(self) -> None:
+        oldest = (datetime.now(timezone.utc) - timedelta(days=MAX_DAYS_BACK + 1)).strftime("%Y-%m-%d")
+        with self._lock:
+            # Drop windows that have left the scrape range
+            self._entries = {k: v for k, v in self._entries.items() if k.rsplit("|", 1)[1] >= oldest}
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as fp:
+                json.dump(self._entries, fp, indent=2)
+                fp.flush()
+                os.fsync(fp.fileno())
+            os.replace(tmp_path, self.path)
+
+scrape_ledger = ScrapeLedger()
+
+def _publish_account(acc: str, account_tweets: List[Dict]) -> bool:
+    # Score the whole 15-day pass in batches, then publish only what
+    # earlier cycles haven't already written
+    score_tweets(account_tweets)
+    new_tweets = sentiment_cache.unseen(account_tweets)
+    tweets_db.extend(new_tweets)  # Add to in-memory database
+
+    # Save all tweets for this account at once
+    logging.info("💾 About to save tweets for account %s (collected: %d tweets, new: %d)", acc, len(account_tweets), len(new_tweets))
+    if new_tweets:
+        if not append_all_tweets(new_tweets):
+            return False
+        sentiment_cache.mark_seen(new_tweets)
+        logging.info("✅ Completed account %s: saved %d tweets total", acc, len(new_tweets))
+    elif account_tweets:
+        logging.info("✅ Completed account %s: no new tweets since last cycle", acc)
+    else:
+        logging.info("⚠️  No tweets found for account: %s", acc)
+    return True
+
+class PolitenessLimiter:
+    """Spaces searches from all workers at least `gap` seconds apart."""
+
+    def __init__(self, gap: float = GLOBAL_SEARCH_GAP):
+        self.gap = gap
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.gap
+        if slot > now:
+            time.sleep(slot - now)
+
+class ScraperPool:
+    """Scrapes one cycle's (account, day) windows with several logged-in drivers.
+
+    The first driver goes through get_logged_in_driver (manual login if the
+    cookies expired); the others reuse the cookie file it just saved. Windows
+    are queued account by account, so an account's tweets are published as
+    soon as its last window finishes. Only windows the scrape ledger reports
+    as due are queued; a window is recorded once its tweets are saved."""
+
+    def __init__(self, workers: int = SCRAPER_WORKERS):
+        self.workers = workers
+        self.limiter = PolitenessLimiter()
+        self._publish_lock = threading.Lock()   # one FinBERT pass / log append at a time
+
+    def _extra_driver(self) -> Optional[uc.Chrome]:
+        drv = _build_driver()
+        if load_cookies(drv) and is_logged_in(drv):
+            return drv
+        drv.quit()
+        return None
+
+    def _drivers(self) -> List[uc.Chrome]:
+        drivers = [get_logged_in_driver()]
+        for n in range(1, self.workers):
+            drv = self._extra_driver()
+            if drv is None:
+                logging.warning("Worker %d could not reuse the session; continuing with %d driver(s)", n + 1, len(drivers))
+                break
+            drivers.append(drv)
+        return drivers
+
+    def run_cycle(self, accounts: List[str]) -> None:
+        jobs: "queue.Queue[Tuple[str, int, str, str]]" = queue.Queue()
+        remaining: Dict[str, int] = {}
+        now = datetime.now(timezone.utc)
+        for acc in accounts:
+            for d in range(MAX_DAYS_BACK):
+                since = (now - timedelta(days=d+1)).strftime("%Y-%m-%d")
+                until = (now - timedelta(days=d  )).strftime("%Y-%m-%d")
+                if scrape_ledger.is_due(acc, since, d):
+                    jobs.put((acc, d, since, until))
+                    remaining[acc] = remaining.get(acc, 0) + 1
+        skipped = len(accounts) * MAX_DAYS_BACK - jobs.qsize()
+        logging.info("🗓️  %d windows due, %d skipped as already complete", jobs.qsize(), skipped)
+        if jobs.empty():
+            return
+
+        collected: Dict[str, List[Dict]] = {acc: [] for acc in remaining}
+        completed: Dict[str, List[Tuple[str, int]]] = {acc: [] for acc in remaining}
+        state_lock = threading.Lock()
+
+        def window_done(acc: str, since: str, tw: Optional[List[Dict]]) -> None:
+            with state_lock:
+                if tw is not None:
+                    collected[acc].extend(tw)  # Add to account collection
+                    completed[acc].append((since, len(tw)))
+                remaining[acc] -= 1
+                logging.info("📊 Account %s now has %d tweets collected so far", acc, len(collected[acc]))
+                if remaining[acc]:
+                    return
+                account_tweets = collected.pop(acc)
+                windows = completed.pop(acc)
+            with self._publish_lock:
+                try:
+                    published = _publish_account(acc, account_tweets)
+                except Exception as exc:   # keep the worker alive; windows stay due
+                    logging.error("❌ Publishing %s failed: %s", acc, exc)
+                    return
+                if published:
+                    for since_date, count in windows:
+                        scrape_ledger.record(acc, since_date, count)
+                    scrape_ledger.save()
+
+        def worker(n: int, driver: uc.Chrome) -> None:
+            last_acc = None
+            while True:
+                try:
+                    acc, d, since, until = jobs.get_nowait()
+                except queue.Empty:
+                    return
+                if last_acc is not None:
+                    pause = ACCOUNT_PAUSE_RANGE if acc != last_acc else DAY_PAUSE_RANGE
+                    time.sleep(random.uniform(*pause))
+                last_acc = acc
+
+                logging.info("📅 [w%d] Scraping %s day %d: %s to %s", n, acc, d+1, since, until)
+                self.limiter.wait()
+                try:
+                    tw = scrape_tweets_advanced(driver, acc, since, until)
+                except Exception as exc:   # never strand an account's remaining count
+                    logging.error("❌ [w%d] %s day %d failed: %s", n, acc, d+1, exc)
+                    tw = None
+                window_done(acc, since, tw)
+
+        drivers = self._drivers()
+        logging.info("🔄 Scraping %d windows with %d worker(s)", jobs.qsize(), len(drivers))
+        threads = [threading.Thread(target=worker, args=(n + 1, drv), daemon=True)
+                   for n, drv in enumerate(drivers)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        save_cookies(drivers[0])    # ← persist any refreshed cookies
+        for drv in drivers:
+            drv.quit()
+
 def _scraper_loop():
+    pool = ScraperPool()
     while True:
-        driver = get_logged_in_driver()
-        for acc in ACCOUNTS:
-            logging.info("🔄 Starting to scrape account: %s", acc)
-            account_tweets = []  # Collect all tweets for this account
-            
-            # Scrape all days for this account
-            for d in range(MAX_DAYS_BACK):
-                since = (datetime.now(timezone.utc) - timedelta(days=d+1)).strftime("%Y-%m-%d")
-                until = (datetime.now(timezone.utc) - timedelta(days=d  )).strftime("%Y-%m-%d")
-                logging.info("📅 Scraping %s day %d: %s to %s", acc, d+1, since, until)
-                tw = scrape_tweets_advanced(driver, acc, since, until)
-                account_tweets.extend(tw)  # Add to account collection
-                tweets_db.extend(tw)       # Add to in-memory database
-                logging.info("📊 Account %s now has %d tweets collected so far", acc, len(account_tweets))
-                time.sleep(random.uniform(*DAY_PAUSE_RANGE))
-            
-            # Save all tweets for this account at once
-            logging.info("💾 About to save tweets for account %s (collected: %d tweets)", acc, len(account_tweets))
-            if account_tweets:
-                append_all_tweets(account_tweets)
-                logging.info("✅ Completed account %s: saved %d tweets total", acc, len(account_tweets))
-            else:
-                logging.info("⚠️  No tweets found for account: %s", acc)
-                
-            time.sleep(random.uniform(*ACCOUNT_PAUSE_RANGE))
-        save_cookies(driver)        # ← persist any refreshed cookies
-        driver.quit()
-        logging.info("Cycle complete – sleeping %d s.", SCRAPE_CYCLE_SECONDS)
+        pool.run_cycle(ACCOUNTS)
+        tweet_log.sync()
+        tweet_log.maybe_compact()
+        logging.info("Cycle complete – sleeping %d s.", SCRAPE_CYCLE_SECONDS)
         time.sleep(SCRAPE_CYCLE_SECONDS)
 
 threading.Thread(target=_scraper_loop, daemon=True).start()
@@ -300,7 +595,7 @@ threading.Thread(target=_scraper_loop, daemon=True).start()
 @app.route("/get_recent_tweets")
 def recent():
     cutoff = datetime.now(timezone.utc) - timedelta(minutes=10)
-    return jsonify([t for t in tweets_db if datetime.fromisoformat(t["timestamp"]) > cutoff])
+    return jsonify(tweets_db.since(cutoff))
 
 # (All other endpoints from previous version remain unchanged; omitted for brevity.)
 
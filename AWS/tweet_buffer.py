@@ -0,0 +1,89 @@
+"""
+Time-indexed in-memory tweet store
+==================================
+• Tweets are kept sorted by their parsed timestamp (epoch microseconds).
+• Inserts use bisect, so out-of-order scrape windows land in the right place.
+• Tweets older than max_age, or beyond max_count (oldest first), are evicted.
+• Range queries are two bisects plus a slice: O(log n + k).
+"""
+
+import threading, time
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def to_epoch_us(dt: datetime) -> int:
+    """Naive datetimes are taken as UTC, which is what both scrapers store."""
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return (dt - _EPOCH) // timedelta(microseconds=1)
+
+
+def parse_epoch_us(ts: str) -> Optional[int]:
+    try:
+        return to_epoch_us(datetime.fromisoformat(ts.replace("Z", "+00:00")))
+    except Exception:
+        return None
+
+
+class TweetBuffer:
+    """Bounded, timestamp-ordered tweet store. Safe to share between threads."""
+
+    def __init__(self, max_age: timedelta, max_count: int):
+        self.max_age_us = max_age // timedelta(microseconds=1)
+        self.max_count = max_count
+        self._lock = threading.Lock()
+        self._keys: List[int] = []
+        self._tweets: List[Dict] = []
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def extend(self, tweets: Iterable[Dict]) -> int:
+        """Insert tweets in timestamp order; ones without a parseable
+        timestamp are dropped. Returns how many were kept."""
+        added = 0
+        with self._lock:
+            for t in tweets:
+                key = parse_epoch_us(t.get("timestamp", ""))
+                if key is None:
+                    continue
+                i = bisect_right(self._keys, key)
+                self._keys.insert(i, key)
+                self._tweets.insert(i, t)
+                added += 1
+            self._evict()
+        return added
+
+    def _evict(self) -> None:
+        now_us = int(time.time() * 1_000_000)
+        drop = bisect_left(self._keys, now_us - self.max_age_us)
+        drop = max(drop, len(self._keys) - self.max_count)
+        if drop > 0:
+            del self._keys[:drop]
+            del self._tweets[:drop]
+
+    def items_between(self, start: datetime, end: datetime) -> List[Tuple[int, Dict]]:
+        """(epoch_us, tweet) pairs with start <= timestamp <= end, oldest first."""
+        with self._lock:
+            self._evict()
+            lo = bisect_left(self._keys, to_epoch_us(start))
+            hi = bisect_right(self._keys, to_epoch_us(end))
+            return list(zip(self._keys[lo:hi], self._tweets[lo:hi]))
+
+    def between(self, start: datetime, end: datetime) -> List[Dict]:
+        return [t for _, t in self.items_between(start, end)]
+
+    def since(self, cutoff: datetime) -> List[Dict]:
+        """Tweets strictly newer than cutoff, oldest first."""
+        with self._lock:
+            self._evict()
+            return self._tweets[bisect_right(self._keys, to_epoch_us(cutoff)):]
+
+    def all(self) -> List[Dict]:
+        with self._lock:
+            self._evict()
+            return list(self._tweets)
@@ -0,0 +1,199 @@
+"""
+Append-only tweet log
+=====================
+• One JSON object per line (JSONL); appends never rewrite the file.
+• fsync is batched: every FSYNC_EVERY tweets or FSYNC_INTERVAL seconds.
+• compact() drops duplicates and torn lines, writing a temp file that is
+  swapped in with os.replace, so a crash never leaves a half-written log.
+• TweetLogReader tails the log by byte offset and notices compactions; it
+  can also report each tweet's byte span so readers can re-read single rows.
+"""
+
+import json, os, time, logging, threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+FSYNC_EVERY      = 100            # tweets between forced fsyncs
+FSYNC_INTERVAL   = 5.0            # seconds between forced fsyncs
+COMPACT_INTERVAL = 6 * 3600       # seconds between maybe_compact() passes
+
+
+def tweet_key(tweet: Dict) -> Tuple:
+    """Identity of a tweet across rescrapes (engagement counts may change)."""
+    return tweet.get("user"), tweet.get("timestamp"), tweet.get("text")
+
+
+def _parse_lines(data: bytes, base: int = 0,
+                 spans: Optional[List[Tuple[int, int]]] = None) -> List[Dict]:
+    """Parse JSONL bytes. If `spans` is given, the (offset, length) of each
+    parsed tweet is appended to it, offsets counted from `base`."""
+    tweets = []
+    start = 0
+    while start < len(data):
+        end = data.find(b"\n", start)
+        if end < 0:
+            end = len(data)
+        line = data[start:end]
+        if line.strip():
+            try:
+                tweets.append(json.loads(line))
+                if spans is not None:
+                    spans.append((base + start, end - start))
+            except ValueError:
+                logging.warning("Skipping unreadable tweet log line (%d bytes)", len(line))
+        start = end + 1
+    return tweets
+
+
+class TweetLog:
+    """Writer side of a JSONL tweet log. Safe to share between threads."""
+
+    def __init__(self, path: str, fsync_every: int = FSYNC_EVERY,
+                 fsync_interval: float = FSYNC_INTERVAL):
+        self.path = path
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self._lock = threading.Lock()
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._last_compact = time.monotonic()
+        self._fp = self._open()
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        fp = open(self.path, "ab")
+        # A crash mid-append can leave a torn last line; start on a fresh one
+        if fp.tell() > 0:
+            with open(self.path, "rb") as rf:
+                rf.seek(-1, os.SEEK_END)
+                if rf.read(1) != b"\n":
+                    fp.write(b"\n")
+        return fp
+
+    def append(self, tweets: List[Dict]) -> None:
+        if not tweets:
+            return
+        data = b"".join(json.dumps(t, ensure_ascii=False).encode("utf-8") + b"\n" for t in tweets)
+        with self._lock:
+            self._fp.write(data)
+            self._fp.flush()
+            self._unsynced += len(tweets)
+            if (self._unsynced >= self.fsync_every
+                    or time.monotonic() - self._last_sync >= self.fsync_interval):
+                self._sync()
+
+    def _sync(self) -> None:
+        os.fsync(self._fp.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def sync(self) -> None:
+        with self._lock:
+            self._fp.flush()
+            self._sync()
+
+    def close(self) -> None:
+        with self._lock:
+            self._fp.flush()
+            self._sync()
+            self._fp.close()
+
+    def read_all(self) -> List[Dict]:
+        with self._lock:
+            self._fp.flush()
+            with open(self.path, "rb") as fp:
+                return _parse_lines(fp.read())
+
+    def compact(self, key: Callable[[Dict], Tuple] = tweet_key) -> Tuple[int, int]:
+        """Rewrite the log without duplicates (latest copy wins, first position
+        kept) or torn lines. Returns (lines before, tweets after)."""
+        with self._lock:
+            self._fp.flush()
+            with open(self.path, "rb") as fp:
+                tweets = _parse_lines(fp.read())
+
+            latest: Dict[Tuple, Dict] = {}
+            for t in tweets:
+                latest[key(t)] = t
+
+            tmp_path = self.path + ".compact"
+            with open(tmp_path, "wb") as out:
+                for k in latest:
+                    out.write(json.dumps(latest[k], ensure_ascii=False).encode("utf-8") + b"\n")
+                out.flush()
+                os.fsync(out.fileno())
+            self._fp.close()
+            os.replace(tmp_path, self.path)
+            self._fp = self._open()
+            self._unsynced = 0
+            self._last_sync = self._last_compact = time.monotonic()
+
+        logging.info("🧹 Compacted %s: %d → %d tweets", self.path, len(tweets), len(latest))
+        return len(tweets), len(latest)
+
+    def maybe_compact(self, interval: float = COMPACT_INTERVAL,
+                      key: Callable[[Dict], Tuple] = tweet_key) -> None:
+        if time.monotonic() - self._last_compact >= interval:
+            self.compact(key)
+
+    def migrate_json(self, json_path: str) -> int:
+        """One-off import of a legacy JSON-array file into an empty log."""
+        if not os.path.exists(json_path) or os.path.getsize(self.path) > 0:
+            return 0
+        try:
+            with open(json_path, "r", encoding="utf-8") as fp:
+                legacy = json.load(fp)
+        except Exception as exc:
+            logging.warning("Could not migrate %s: %s", json_path, exc)
+            return 0
+        legacy = [t for t in legacy if isinstance(t, dict)]
+        self.append(legacy)
+        self.sync()
+        logging.info("📦 Migrated %d tweets from %s into %s", len(legacy), json_path, self.path)
+        return len(legacy)
+
+
+class TweetLogReader:
+    """Incremental reader: each read_new() returns only tweets appended since
+    the previous call. A compaction (new inode or shrunk file) restarts from
+    the top and is reported with reset=True. `inode` identifies the file the
+    last call read, for checking that byte spans it returned still apply."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._offset = 0
+        self._inode: Optional[int] = None
+
+    @property
+    def inode(self) -> Optional[int]:
+        return self._inode
+
+    def read_new(self) -> Tuple[List[Dict], bool]:
+        tweets, _, reset = self.read_new_rows()
+        return tweets, reset
+
+    def read_new_rows(self) -> Tuple[List[Dict], List[Tuple[int, int]], bool]:
+        """Like read_new, plus the (offset, length) byte span of each tweet."""
+        try:
+            fp = open(self.path, "rb")
+        except OSError:
+            reset = self._inode is not None
+            self._offset, self._inode = 0, None
+            return [], [], reset
+
+        with fp:
+            # fstat the handle we read from, not the path: a compaction may
+            # swap the file in between
+            st = os.fstat(fp.fileno())
+            reset = False
+            if self._inode is not None and (st.st_ino != self._inode or st.st_size < self._offset):
+                self._offset = 0
+                reset = True
+            self._inode = st.st_ino
+            fp.seek(self._offset)
+            data = fp.read()
+        # Leave a trailing line without its newline for the next call
+        complete = data.rfind(b"\n") + 1
+        base = self._offset
+        self._offset += complete
+        spans: List[Tuple[int, int]] = []
+        return _parse_lines(data[:complete], base, spans), spans, reset
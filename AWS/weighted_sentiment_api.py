@@ -2,14 +2,34 @@ from flask import Flask, jsonify, request
 from flask_cors import CORS  # <-- For allowing cross-origin requests
 import os
 import json
+import threading
 from datetime import datetime, timedelta
 
+import numpy as np
+
+from tweet_log import TweetLogReader
+
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes; allows requests from any origin
 
 # IMPORTANT: This is your new file with the tweets data.
+# A scraper's .jsonl tweet log also works here and is tailed incrementally.
 TWEETS_FILE = "temp.json"
 
+EPOCH = datetime(1970, 1, 1)
+MINUTE_US = 60 * 1_000_000
+HOUR_US = 60 * MINUTE_US
+DAY_US = 24 * HOUR_US
+
+SENTIMENT_LABELS = ("positive", "neutral", "negative")
+SENTIMENT_VALUE_MAP = {"positive": 1, "neutral": 0, "negative": -1}
+SENTIMENT_CODES = {label: code for code, label in enumerate(SENTIMENT_LABELS)}
+SENTIMENT_VALUES = np.array([SENTIMENT_VALUE_MAP[label] for label in SENTIMENT_LABELS], dtype=float)
+# Fields compute_sentiment_reference reads
+REFERENCE_FIELDS = ("timestamp", "sentiment", "sentiment_probability")
+# Tries at reading listed tweets back before giving up on a file being rewritten
+READ_ATTEMPTS = 3
+
 # ---------------- HELPER FUNCTIONS ----------------
 
 def parse_timestamp(ts_str):
@@ -22,19 +42,389 @@ def parse_timestamp(ts_str):
     except Exception:
         return None
 
+def to_epoch_us(dt):
+    """
+    Microseconds since the Unix epoch for an offset-naive datetime.
+    """
+    return (dt - EPOCH) // timedelta(microseconds=1)
+
+def from_epoch_us(us):
+    """
+    Inverse of to_epoch_us.
+    """
+    return EPOCH + timedelta(microseconds=int(us))
+
+def parse_count(value):
+    """
+    Engagement counts are stored as strings in the JSON; anything unparseable counts as 0.
+    """
+    try:
+        return int(value)
+    except:
+        return 0
+
 def load_tweets():
     """
     Load tweets from the JSON file. If it doesn’t exist or fails to parse,
-    return an empty list.
+    return an empty list. Read back from the file through tweet_store's
+    current table.
+    """
+    return read_tweets(lambda table: np.arange(len(table))) or []
+
+def parse_json_array(data):
+    """
+    Parse a JSON array of tweets, also returning each element's
+    (offset, length) byte span in `data`.
+    """
+    text = data.decode("utf-8")
+    decoder = json.JSONDecoder()
+    tweets, spans = [], []
+    byte_pos = char_pos = 0
+
+    def to_byte(pos):
+        nonlocal byte_pos, char_pos
+        byte_pos += len(text[char_pos:pos].encode("utf-8"))
+        char_pos = pos
+        return byte_pos
+
+    def skip_ws(pos):
+        while pos < len(text) and text[pos] in " \t\r\n":
+            pos += 1
+        return pos
+
+    pos = skip_ws(0)
+    if text[pos:pos + 1] != "[":
+        raise ValueError("Expected a JSON array of tweets")
+    pos = skip_ws(pos + 1)
+    if text[pos:pos + 1] == "]":
+        return tweets, spans
+    while True:
+        tweet, end = decoder.raw_decode(text, pos)
+        start_byte = to_byte(pos)
+        tweets.append(tweet)
+        spans.append((start_byte, to_byte(end) - start_byte))
+        pos = skip_ws(end)
+        if text[pos:pos + 1] == "]":
+            return tweets, spans
+        if text[pos:pos + 1] != ",":
+            raise ValueError(f"Expected ',' or ']' at character {pos}")
+        pos = skip_ws(pos + 1)
+
+class StaleTweetFile(Exception):
+    """
+    The tweet file was replaced or rewritten after a table was built from it.
+    """
+
+class TweetSource:
+    """
+    The file a TweetTable was parsed from, as it was when read. read() loads
+    the tweets at given byte spans. A tweet log (no signature) stays valid
+    while its inode is the same, since appends never move earlier lines; any
+    other file must still have the (mtime, size) signature it was read with.
     """
-    if not os.path.exists(TWEETS_FILE):
-        return []
-    with open(TWEETS_FILE, "r", encoding="utf-8") as f:
+
+    def __init__(self, path, inode, signature=None):
+        self.path = path
+        self.inode = inode
+        self.signature = signature
+
+    def read(self, offsets, lengths, keep=None):
+        """
+        Tweets at the given spans, in the given order, optionally only those
+        keep(tweet) accepts. Raises StaleTweetFile if the spans no longer apply.
+        """
+        if not len(offsets):
+            return []
         try:
-            tweets = json.load(f)
+            fp = open(self.path, "rb")
+        except OSError:
+            raise StaleTweetFile(self.path)
+        with fp:
+            st = os.fstat(fp.fileno())
+            if self.signature is None:
+                valid = st.st_ino == self.inode and st.st_size >= int((offsets + lengths).max())
+            else:
+                valid = (st.st_mtime_ns, st.st_size) == self.signature
+            if not valid:
+                raise StaleTweetFile(self.path)
+            # Read in file order, return in the requested order
+            found = {}
+            for i in np.argsort(offsets, kind="stable"):
+                fp.seek(int(offsets[i]))
+                tweet = json.loads(fp.read(int(lengths[i])))
+                if keep is None or keep(tweet):
+                    found[i] = tweet
+        return [found[i] for i in sorted(found)]
+
+# ---------------- COLUMNAR TWEET TABLE ----------------
+
+class TweetTable:
+    """
+    Column-oriented copy of the fields the aggregations read, one entry per
+    tweet in file order. Whole tweets are not held in memory: each row keeps
+    the byte span of its JSON in `source`, and the listing endpoints read
+    rows back from the file through tweets_at().
+    """
+
+    def __init__(self, tweets, source=None, spans=None):
+        n = len(tweets)
+        self.source = source
+        self.offsets = np.zeros(n, dtype=np.int64)
+        self.lengths = np.zeros(n, dtype=np.int32)
+        if spans:
+            self.offsets[:], self.lengths[:] = zip(*spans)
+        self.ts_us = np.zeros(n, dtype=np.int64)
+        self.ts_valid = np.zeros(n, dtype=bool)
+        self.codes = np.full(n, -1, dtype=np.int8)
+        self.probs = np.zeros(n, dtype=np.float32)
+        self.likes = np.zeros(n, dtype=np.int64)
+        self.retweets = np.zeros(n, dtype=np.int64)
+        self.user_codes = np.zeros(n, dtype=np.int32)
+        self.users = []
+        # Rows the vectorized kernel reproduces exactly; anything else goes
+        # through compute_sentiment_reference, using the raw fields kept in
+        # `irregular` (row -> dict)
+        self.exact = np.ones(n, dtype=bool)
+        self.irregular = {}
+
+        user_ids = {}
+        for i, t in enumerate(tweets):
+            dt = parse_timestamp(t.get('timestamp'))
+            if dt is not None:
+                self.ts_us[i] = to_epoch_us(dt)
+                self.ts_valid[i] = True
+            else:
+                self.exact[i] = False
+
+            code = SENTIMENT_CODES.get(t.get("sentiment", "neutral"), -1)
+            prob = t.get("sentiment_probability", 0)
+            self.codes[i] = code
+            if code >= 0 and isinstance(prob, (int, float)):
+                self.probs[i] = prob
+            else:
+                self.exact[i] = False
+
+            if not self.exact[i]:
+                self.irregular[i] = {k: t[k] for k in REFERENCE_FIELDS if k in t}
+
+            self.likes[i] = parse_count(t.get("likes", "0"))
+            self.retweets[i] = parse_count(t.get("retweets", "0"))
+
+            user = t.get("user", "unknown")
+            if user not in user_ids:
+                user_ids[user] = len(self.users)
+                self.users.append(user)
+            self.user_codes[i] = user_ids[user]
+
+        self._sort()
+
+    def __len__(self):
+        return len(self.ts_us)
+
+    def _sort(self):
+        valid_rows = np.flatnonzero(self.ts_valid)
+        self.order = valid_rows[np.argsort(self.ts_us[valid_rows], kind="stable")]
+        self.sorted_ts_us = self.ts_us[self.order]
+
+    def appended(self, new_tweets, source, spans):
+        """
+        Table for this table's rows + new_tweets that only parses the new
+        rows; `source` is the (same) file they were appended to.
+        """
+        tail = TweetTable(new_tweets, source, spans)
+        table = TweetTable.__new__(TweetTable)
+        table.source = source
+        for column in ("offsets", "lengths", "ts_us", "ts_valid", "codes", "probs", "likes", "retweets", "exact"):
+            setattr(table, column, np.concatenate((getattr(self, column), getattr(tail, column))))
+        table.irregular = dict(self.irregular)
+        table.irregular.update((len(self) + i, fields) for i, fields in tail.irregular.items())
+
+        table.users = list(self.users)
+        user_ids = {user: code for code, user in enumerate(table.users)}
+        remap = np.zeros(len(tail.users), dtype=np.int32)
+        for code, user in enumerate(tail.users):
+            if user not in user_ids:
+                user_ids[user] = len(table.users)
+                table.users.append(user)
+            remap[code] = user_ids[user]
+        table.user_codes = np.concatenate((self.user_codes, remap[tail.user_codes]))
+
+        table._sort()
+        return table
+
+    def tweets_at(self, rows, keep=None):
+        """
+        Whole tweets for `rows`, read back from the source file (see
+        TweetSource.read).
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        if not len(rows):
+            return []
+        if self.source is None:
+            raise StaleTweetFile(None)
+        return self.source.read(self.offsets[rows], self.lengths[rows], keep)
+
+    def reference_fields(self, row):
+        """
+        The fields compute_sentiment_reference reads, for one row.
+        """
+        if row in self.irregular:
+            return self.irregular[row]
+        return {
+            "timestamp": from_epoch_us(self.ts_us[row]).isoformat(),
+            "sentiment": SENTIMENT_LABELS[self.codes[row]],
+            "sentiment_probability": float(self.probs[row])
+        }
+
+    def rows_between(self, start_us, end_us):
+        """
+        Rows (file order) with start_us <= timestamp <= end_us.
+        """
+        mask = self.ts_valid & (self.ts_us >= start_us) & (self.ts_us <= end_us)
+        return np.flatnonzero(mask)
+
+    def group_rows(self, keys, rows):
+        """
+        Split `rows` by `keys` (one key per row). Groups come back in order of
+        first appearance and keep the order of `rows` inside each group.
+        """
+        if len(rows) == 0:
+            return []
+        uniq, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+        by_group = np.argsort(inverse, kind="stable")
+        bounds = np.cumsum(np.bincount(inverse, minlength=len(uniq)))[:-1]
+        chunks = np.split(rows[by_group], bounds)
+        return [(uniq[g], chunks[g]) for g in np.argsort(first, kind="stable")]
+
+    def sentiment(self, rows):
+        """
+        Vectorized compute_sentiment over the given rows.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        if len(rows) == 0:
+            return None
+        if not self.exact[rows].all():
+            return compute_sentiment_reference([self.reference_fields(int(i)) for i in rows])
+
+        rows = rows[np.argsort(self.ts_us[rows], kind="stable")]
+        ts = self.ts_us[rows]
+        codes = self.codes[rows]
+        start_us, end_us = ts[0], ts[-1]
+        total_seconds = (end_us - start_us) / 1e6
+
+        terms = SENTIMENT_VALUES[codes] * self.probs[rows]
+        weighted_counts = {}
+        if total_seconds > 0:
+            # Weight is fraction of time from earliest to this tweet
+            weights = ((ts - start_us) / 1e6) / total_seconds
+            terms = terms * weights
+            for code, label in enumerate(SENTIMENT_LABELS):
+                picked = weights[codes == code]
+                weighted_counts[label] = float(np.cumsum(picked)[-1]) if len(picked) else 0
+        else:
+            for code, label in enumerate(SENTIMENT_LABELS):
+                weighted_counts[label] = int(np.count_nonzero(codes == code))
+        # cumsum, not sum: same left-to-right accumulation as the reference loop
+        overall_weighted_score = float(np.cumsum(np.concatenate(([0.0], terms)))[-1])
+
+        n = len(rows)
+        if n > 1:
+            # Simple "theoretical min/max" approach for normalizing to 0..100
+            min_possible = - (n - 1) / 2.0
+            max_possible = (n - 1) / 2.0
+            normalized_score = ((overall_weighted_score - min_possible) / (max_possible - min_possible)) * 100
+        else:
+            # If only one tweet, treat it as neutral 50
+            normalized_score = 50
+
+        return {
+            "start": from_epoch_us(start_us).isoformat(),
+            "end": from_epoch_us(end_us).isoformat(),
+            "total_tweets": n,
+            "weighted_sentiment_counts": weighted_counts,
+            "overall_weighted_sentiment_score": overall_weighted_score,
+            "normalized_overall_weighted_sentiment_score": normalized_score
+        }
+
+# ---------------- IN-MEMORY TWEET STORE ----------------
+
+class TweetSnapshot:
+    """
+    One parsed version of TWEETS_FILE. Never mutated after construction, so
+    request threads can share it without locking.
+    """
+
+    def __init__(self, table, signature):
+        self.signature = signature
+        self.table = table
+        self.index = SentimentPrefixIndex(table)
+
+class TweetStore:
+    """
+    Process-wide cache of TWEETS_FILE. The file is re-read only when its
+    (mtime, size) changes; the new snapshot is built off to the side and
+    swapped in with a single assignment. A .jsonl tweet log is tailed: only
+    lines appended since the last snapshot are parsed. Snapshots hold only
+    the columnar table; parsed tweets are dropped once it is built.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._tail = TweetLogReader(path) if path.endswith(".jsonl") else None
+
+    def _signature(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _build(self, previous):
+        """
+        Table for the file's current contents, or None to keep `previous`.
+        """
+        if self._tail is not None:
+            new_tweets, spans, reset = self._tail.read_new_rows()
+            if self._tail.inode is None:
+                return TweetTable([])
+            source = TweetSource(self.path, self._tail.inode)
+            if previous is None or reset:
+                return TweetTable(new_tweets, source, spans)
+            return previous.table.appended(new_tweets, source, spans)
+        return self._read()
+
+    def _read(self):
+        try:
+            with open(self.path, "rb") as f:
+                st = os.fstat(f.fileno())
+                data = f.read()
+        except OSError:
+            return TweetTable([])
+        try:
+            tweets, spans = parse_json_array(data)
         except Exception:
-            tweets = []
-    return tweets
+            # Most likely caught the scraper mid-write; retry on the next request
+            return None
+        return TweetTable(tweets, TweetSource(self.path, st.st_ino, (st.st_mtime_ns, st.st_size)), spans)
+
+    def snapshot(self):
+        signature = self._signature()
+        snap = self._snapshot
+        if snap is not None and snap.signature == signature:
+            return snap
+
+        with self._lock:
+            snap = self._snapshot
+            if snap is None or snap.signature != signature:
+                table = self._build(snap)
+                if table is not None:
+                    snap = TweetSnapshot(table, signature)
+                elif snap is None:
+                    snap = TweetSnapshot(TweetTable([]), None)
+                self._snapshot = snap
+        return snap
 
 # --------------- ORIGINAL SENTIMENT-RELATED FUNCTIONS ---------------
 
@@ -43,6 +433,16 @@ def compute_sentiment(tweets):
     Sort tweets by timestamp, then weight them linearly from earliest to latest.
     Returns a dict with sentiment metrics, or None if tweets is empty.
     """
+    if not tweets:
+        return None
+    table = TweetTable(tweets)
+    return table.sentiment(np.arange(len(tweets)))
+
+def compute_sentiment_reference(tweets):
+    """
+    Row-by-row version of compute_sentiment. TweetTable falls back to it for
+    rows it can't reproduce exactly (unparseable timestamps, unknown labels).
+    """
     if not tweets:
         return None
 
@@ -90,114 +490,176 @@ def compute_sentiment(tweets):
         "normalized_overall_weighted_sentiment_score": normalized_score
     }
 
+class SentimentPrefixIndex:
+    """
+    Tweets sorted by timestamp plus cumulative sums over that order.
+
+    For a cutoff c, every tweet up to c is weighted (t_i - t0) / (c - t0), where
+    t0 is the earliest tweet overall. Each weighted total is therefore a prefix
+    sum of (t_i - t0) * x_i divided by (c - t0), so a time-decayed sentiment
+    costs one binary search instead of a rescan of every tweet.
+    """
+
+    def __init__(self, table):
+        self.table = table
+        self.order = table.order
+        self.ts_us = table.sorted_ts_us
+        self.earliest = from_epoch_us(self.ts_us[0]) if len(self.ts_us) else None
+
+        offsets = (self.ts_us - self.ts_us[0]) / 1e6 if len(self.ts_us) else np.zeros(0)
+        codes = table.codes[self.order]
+        values = np.where(codes >= 0, SENTIMENT_VALUES[codes], 0.0)
+        probs = table.probs[self.order]
+
+        self.cum_count = {}
+        self.cum_offset = {}
+        for code, label in enumerate(SENTIMENT_LABELS):
+            mask = codes == code
+            self.cum_count[label] = np.concatenate(([0], np.cumsum(mask)))
+            self.cum_offset[label] = np.concatenate(([0.0], np.cumsum(np.where(mask, offsets, 0.0))))
+        self.cum_score = np.concatenate(([0.0], np.cumsum(values * probs * offsets)))
+        self.cum_inexact = np.concatenate(([0], np.cumsum(~table.exact[self.order])))
+
+    def decay_sentiment_up_to(self, cutoff_time):
+        """
+        Same result as computing the time-decayed sentiment of every tweet up to
+        (and including) `cutoff_time`. Returns None if there are none.
+        """
+        k = int(np.searchsorted(self.ts_us, to_epoch_us(cutoff_time), side="right"))
+        if k == 0:
+            return None
+        return self._decayed(k, cutoff_time)
+
+    def prefix_sentiment(self, k):
+        """
+        compute_sentiment over the k earliest tweets: the decayed sentiment with
+        the cutoff at the k-th tweet. Returns None for k == 0.
+        """
+        if k == 0:
+            return None
+        if self.cum_inexact[k]:
+            return self.table.sentiment(self.order[:k])
+        return self._decayed(k, from_epoch_us(self.ts_us[k - 1]))
+
+    def _decayed(self, k, cutoff_time):
+        total_seconds = (cutoff_time - self.earliest).total_seconds()
+        if total_seconds <= 0:
+            return self.table.sentiment(self.order[:k])
+
+        weighted_counts = {
+            label: float(self.cum_offset[label][k] / total_seconds) if self.cum_count[label][k] else 0
+            for label in SENTIMENT_LABELS
+        }
+        overall_weighted_score = float(self.cum_score[k] / total_seconds)
+
+        n = k
+        if n > 1:
+            min_possible = - (n - 1) / 2.0
+            max_possible = (n - 1) / 2.0
+            normalized_score = ((overall_weighted_score - min_possible) / (max_possible - min_possible)) * 100
+        else:
+            normalized_score = 50
+
+        return {
+            "start": self.earliest.isoformat(),
+            "end": cutoff_time.isoformat(),
+            "total_tweets": n,
+            "weighted_sentiment_counts": weighted_counts,
+            "overall_weighted_sentiment_score": overall_weighted_score,
+            "normalized_overall_weighted_sentiment_score": normalized_score
+        }
+
 def compute_time_decay_sentiment_up_to(tweets_sorted, cutoff_time):
     """
     Compute a time-decayed sentiment for all tweets up to (and including) `cutoff_time`.
     The newest tweet in that range has weight near 1, the oldest near 0.
     Returns None if there are no tweets in the range.
+    Build a SentimentPrefixIndex once when querying many cutoffs.
     """
-    relevant = [t for t in tweets_sorted if parse_timestamp(t['timestamp']) and parse_timestamp(t['timestamp']) <= cutoff_time]
-    if not relevant:
-        return None
-
-    relevant_sorted = sorted(relevant, key=lambda t: parse_timestamp(t['timestamp']))
-    earliest = parse_timestamp(relevant_sorted[0]['timestamp'])
-    total_seconds = (cutoff_time - earliest).total_seconds() if earliest else 0
-    if total_seconds <= 0:
-        return compute_sentiment(relevant_sorted)
+    return SentimentPrefixIndex(TweetTable(tweets_sorted)).decay_sentiment_up_to(cutoff_time)
 
-    sentiment_value_map = {"positive": 1, "neutral": 0, "negative": -1}
-    weighted_counts = {"positive": 0, "neutral": 0, "negative": 0}
-    overall_weighted_score = 0.0
+tweet_store = TweetStore(TWEETS_FILE)
 
-    for tw in relevant_sorted:
-        tw_time = parse_timestamp(tw['timestamp'])
-        if tw_time is None:
+def read_tweets(select, keep=None):
+    """
+    Whole tweets for the rows select(table) picks from the current table,
+    read back from the tweet file. If the file was rewritten since the table
+    was built, the next snapshot rebuilds it (its signature has changed) and
+    the rows are picked again. Returns None if the file keeps changing
+    underneath.
+    """
+    for _ in range(READ_ATTEMPTS):
+        table = tweet_store.snapshot().table
+        try:
+            return table.tweets_at(select(table), keep)
+        except StaleTweetFile:
             continue
-        fraction_of_range = (tw_time - earliest).total_seconds() / total_seconds
+    return None
 
-        sentiment = tw.get("sentiment", "neutral")
-        prob = tw.get("sentiment_probability", 0)
-        weighted_counts[sentiment] += fraction_of_range
-        overall_weighted_score += sentiment_value_map.get(sentiment, 0) * prob * fraction_of_range
-
-    n = len(relevant_sorted)
-    if n > 1:
-        min_possible = - (n - 1) / 2.0
-        max_possible = (n - 1) / 2.0
-        normalized_score = ((overall_weighted_score - min_possible) / (max_possible - min_possible)) * 100
-    else:
-        normalized_score = 50
-
-    return {
-        "start": earliest.isoformat() if earliest else None,
-        "end": cutoff_time.isoformat(),
-        "total_tweets": n,
-        "weighted_sentiment_counts": weighted_counts,
-        "overall_weighted_sentiment_score": overall_weighted_score,
-        "normalized_overall_weighted_sentiment_score": normalized_score
-    }
+def tweets_unavailable():
+    return jsonify({"error": "Tweet file is being rewritten, please retry"}), 503
 
 # ---------------- FIXED RANGE ENDPOINTS ----------------
 
 @app.route('/get_weighted_sentiment_all', methods=['GET'])
 def get_weighted_sentiment_all():
-    tweets = load_tweets()
-    if not tweets:
+    snap = tweet_store.snapshot()
+    if not len(snap.table):
         return jsonify({"error": "No tweets available"}), 404
-    result = compute_sentiment(tweets)
+    result = snap.table.sentiment(np.arange(len(snap.table)))
     if not result or "error" in result:
         return jsonify(result), 500
     return jsonify(result), 200
 
 @app.route('/get_sentiment_today', methods=['GET'])
 def get_sentiment_today():
-    tweets = load_tweets()
-    if not tweets:
+    snap = tweet_store.snapshot()
+    if not len(snap.table):
         return jsonify({"error": "No tweets available"}), 404
 
-    today = datetime.now().date()
-    filtered = [t for t in tweets if parse_timestamp(t['timestamp']) and parse_timestamp(t['timestamp']).date() == today]
-    if not filtered:
+    table = snap.table
+    today = to_epoch_us(datetime.combine(datetime.now().date(), datetime.min.time())) // DAY_US
+    filtered = np.flatnonzero(table.ts_valid & (table.ts_us // DAY_US == today))
+    if not len(filtered):
         return jsonify({"error": "No tweets for today"}), 404
 
-    result = compute_sentiment(filtered)
+    result = table.sentiment(filtered)
     return jsonify(result), 200
 
 @app.route('/get_sentiment_week', methods=['GET'])
 def get_sentiment_week():
-    tweets = load_tweets()
-    if not tweets:
+    snap = tweet_store.snapshot()
+    if not len(snap.table):
         return jsonify({"error": "No tweets available"}), 404
 
     now = datetime.now()
     one_week_ago = now - timedelta(days=7)
-    filtered = [t for t in tweets if one_week_ago <= parse_timestamp(t['timestamp']) <= now]
-    if not filtered:
+    filtered = snap.table.rows_between(to_epoch_us(one_week_ago), to_epoch_us(now))
+    if not len(filtered):
         return jsonify({"error": "No tweets in the past week"}), 404
 
-    result = compute_sentiment(filtered)
+    result = snap.table.sentiment(filtered)
     return jsonify(result), 200
 
 @app.route('/get_sentiment_month', methods=['GET'])
 def get_sentiment_month():
-    tweets = load_tweets()
-    if not tweets:
+    snap = tweet_store.snapshot()
+    if not len(snap.table):
         return jsonify({"error": "No tweets available"}), 404
 
     now = datetime.now()
     one_month_ago = now - timedelta(days=30)
-    filtered = [t for t in tweets if one_month_ago <= parse_timestamp(t['timestamp']) <= now]
-    if not filtered:
+    filtered = snap.table.rows_between(to_epoch_us(one_month_ago), to_epoch_us(now))
+    if not len(filtered):
         return jsonify({"error": "No tweets in the past month"}), 404
 
-    result = compute_sentiment(filtered)
+    result = snap.table.sentiment(filtered)
     return jsonify(result), 200
 
 @app.route('/get_sentiment_range', methods=['GET'])
 def get_sentiment_range():
-    tweets = load_tweets()
-    if not tweets:
+    snap = tweet_store.snapshot()
+    if not len(snap.table):
         return jsonify({"error": "No tweets available"}), 404
 
     start_str = request.args.get("start")
@@ -210,200 +672,141 @@ def get_sentiment_range():
     if not start_date or not end_date:
         return jsonify({"error": "Error parsing 'start' or 'end' date"}), 400
 
-    filtered = [t for t in tweets if start_date <= parse_timestamp(t['timestamp']) <= end_date]
-    if not filtered:
+    filtered = snap.table.rows_between(to_epoch_us(start_date), to_epoch_us(end_date))
+    if not len(filtered):
         return jsonify({"error": "No tweets in the specified date range"}), 404
 
-    result = compute_sentiment(filtered)
+    result = snap.table.sentiment(filtered)
     return jsonify(result), 200
 
 # ---------------- GROUPED ENDPOINTS FOR COMPARISONS ----------------
 
+def iso_week_keys(days):
+    """
+    ISO year * 100 + ISO week for an array of day numbers (days since 1970-01-01).
+    """
+    weekday = (days + 3) % 7  # Monday == 0; 1970-01-01 was a Thursday
+    thursday = days - weekday + 3  # the ISO year is the year of the week's Thursday
+    year = thursday.astype("datetime64[D]").astype("datetime64[Y]").astype(np.int64) + 1970
+    year_start = (year - 1970).astype("datetime64[Y]").astype("datetime64[D]").astype(np.int64)
+    return year * 100 + (thursday - year_start) // 7 + 1
+
+def sentiment_by_group(table, keys, key_label):
+    """
+    compute_sentiment for every group of tweets sharing a key, in order of
+    first appearance. `key_label` turns a key into the response key.
+    """
+    rows = np.flatnonzero(table.ts_valid)
+    results = {}
+    for key, group in table.group_rows(keys[rows], rows):
+        results[key_label(key)] = table.sentiment(group)
+    return results
+
 @app.route('/get_sentiment_by_day', methods=['GET'])
 def get_sentiment_by_day():
-    tweets = load_tweets()
-    if not tweets:
+    snap = tweet_store.snapshot()
+    if not len(snap.table):
         return jsonify({"error": "No tweets available"}), 404
 
-    groups = {}
-    for tweet in tweets:
-        dt = parse_timestamp(tweet['timestamp'])
-        if not dt:
-            continue
-        day_key = dt.strftime("%Y-%m-%d")
-        groups.setdefault(day_key, []).append(tweet)
-
-    results = {}
-    for day, group in groups.items():
-        sentiment = compute_sentiment(group)
-        results[day] = sentiment
+    days = snap.table.ts_us // DAY_US
+    results = sentiment_by_group(snap.table, days, lambda day: from_epoch_us(day * DAY_US).strftime("%Y-%m-%d"))
     return jsonify(results), 200
 
 @app.route('/get_sentiment_by_week', methods=['GET'])
 def get_sentiment_by_week():
-    tweets = load_tweets()
-    if not tweets:
+    snap = tweet_store.snapshot()
+    if not len(snap.table):
         return jsonify({"error": "No tweets available"}), 404
 
-    groups = {}
-    for tweet in tweets:
-        dt = parse_timestamp(tweet['timestamp'])
-        if dt is None:
-            continue
-        iso_year, iso_week, _ = dt.isocalendar()
-        week_key = f"{iso_year}-W{iso_week:02d}"
-        groups.setdefault(week_key, []).append(tweet)
-
-    results = {}
-    for week, group in groups.items():
-        sentiment = compute_sentiment(group)
-        results[week] = sentiment
+    weeks = iso_week_keys(snap.table.ts_us // DAY_US)
+    results = sentiment_by_group(snap.table, weeks, lambda week: f"{week // 100}-W{week % 100:02d}")
     return jsonify(results), 200
 
 @app.route('/get_sentiment_by_month', methods=['GET'])
 def get_sentiment_by_month():
-    tweets = load_tweets()
-    if not tweets:
+    snap = tweet_store.snapshot()
+    if not len(snap.table):
         return jsonify({"error": "No tweets available"}), 404
 
-    groups = {}
-    for tweet in tweets:
-        dt = parse_timestamp(tweet['timestamp'])
-        if dt is None:
-            continue
-        month_key = dt.strftime("%Y-%m")
-        groups.setdefault(month_key, []).append(tweet)
-
-    results = {}
-    for month, group in groups.items():
-        sentiment = compute_sentiment(group)
-        results[month] = sentiment
+    days = snap.table.ts_us // DAY_US
+    months = days.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+    results = sentiment_by_group(snap.table, months, lambda month: f"{1970 + month // 12}-{month % 12 + 1:02d}")
     return jsonify(results), 200
 
 # ---------------- 5-MIN AND HOUR GROUPED ENDPOINTS ----------------
 
-@app.route('/get_sentiment_by_5min', methods=['GET'])
-def get_sentiment_by_5min():
-    tweets = load_tweets()
-    if not tweets:
-        return jsonify({"error": "No tweets available"}), 404
+def compute_combined_sentiment(from_current, from_history):
+    default_sentiment = {
+        "normalized_overall_weighted_sentiment_score": 50,
+        "overall_weighted_sentiment_score": 0,
+        "total_tweets": 0
+    }
+    from_current = from_current or default_sentiment
 
-    try:
-        tweets_sorted = sorted(tweets, key=lambda t: parse_timestamp(t['timestamp']))
-    except Exception:
-        tweets_sorted = tweets
+    if not from_history:
+        return from_current
 
-    groups = {}
-    for tweet in tweets_sorted:
-        dt = parse_timestamp(tweet['timestamp'])
-        if dt is None:
-            continue
-        dt_floor = dt.replace(second=0, microsecond=0)
-        minute_bucket = (dt_floor.minute // 5) * 5
-        bucket_start = dt_floor.replace(minute=minute_bucket)
-        key = bucket_start.isoformat()
-        groups.setdefault(key, []).append(tweet)
-
-    def compute_combined_sentiment(current_tweets, historical_tweets):
-        default_sentiment = {
-            "normalized_overall_weighted_sentiment_score": 50,
-            "overall_weighted_sentiment_score": 0,
-            "total_tweets": 0
-        }
-        from_current = compute_sentiment(current_tweets) or default_sentiment
-        from_history = compute_sentiment(historical_tweets) if historical_tweets else None
+    c_norm = from_current.get("normalized_overall_weighted_sentiment_score", 50)
+    h_norm = from_history.get("normalized_overall_weighted_sentiment_score", 50)
+    combined_norm = 0.7 * h_norm + 0.3 * c_norm
 
-        if not from_history:
-            return from_current
+    c_ov = from_current.get("overall_weighted_sentiment_score", 0)
+    h_ov = from_history.get("overall_weighted_sentiment_score", 0)
+    combined_ov = 0.7 * h_ov + 0.3 * c_ov
 
-        c_norm = from_current.get("normalized_overall_weighted_sentiment_score", 50)
-        h_norm = from_history.get("normalized_overall_weighted_sentiment_score", 50)
-        combined_norm = 0.7 * h_norm + 0.3 * c_norm
-
-        c_ov = from_current.get("overall_weighted_sentiment_score", 0)
-        h_ov = from_history.get("overall_weighted_sentiment_score", 0)
-        combined_ov = 0.7 * h_ov + 0.3 * c_ov
+    return {
+        "historical_sentiment": from_history,
+        "current_bucket_sentiment": from_current,
+        "combined_overall_weighted_sentiment_score": combined_ov,
+        "combined_normalized_overall_weighted_sentiment_score": combined_norm,
+        "total_tweets": from_history.get("total_tweets", 0) + from_current.get("total_tweets", 0)
+    }
 
-        return {
-            "historical_sentiment": from_history,
-            "current_bucket_sentiment": from_current,
-            "combined_overall_weighted_sentiment_score": combined_ov,
-            "combined_normalized_overall_weighted_sentiment_score": combined_norm,
-            "total_tweets": from_history.get("total_tweets", 0) + from_current.get("total_tweets", 0)
-        }
+def sentiment_by_bucket(snap, bucket_us):
+    """
+    Combined sentiment for each fixed-width bucket of tweets against all
+    tweets before the bucket, in one sweep over the sorted tweets. A bucket is
+    a contiguous run of the sort order and its history is everything before
+    that run, so the history comes from the index's running totals.
+    """
+    index = snap.index
+    ts = index.ts_us
+    if not len(ts):
+        return {}
 
+    bucket_starts = ts - ts % bucket_us
+    bounds = np.flatnonzero(np.diff(bucket_starts)) + 1
     results = {}
-    for bucket_key, bucket_tweets in groups.items():
-        bucket_start = parse_timestamp(bucket_key)
-        historical_tweets = [t for t in tweets_sorted if parse_timestamp(t['timestamp']) < bucket_start]
-        combined_senti = compute_combined_sentiment(bucket_tweets, historical_tweets)
-        results[bucket_key] = combined_senti
+    for lo, hi in zip(np.concatenate(([0], bounds)), np.concatenate((bounds, [len(ts)]))):
+        from_current = snap.table.sentiment(index.order[lo:hi])
+        from_history = index.prefix_sentiment(int(lo))
+        results[from_epoch_us(bucket_starts[lo]).isoformat()] = compute_combined_sentiment(from_current, from_history)
+    return results
+
+@app.route('/get_sentiment_by_5min', methods=['GET'])
+def get_sentiment_by_5min():
+    snap = tweet_store.snapshot()
+    if not len(snap.table):
+        return jsonify({"error": "No tweets available"}), 404
 
+    results = sentiment_by_bucket(snap, 5 * MINUTE_US)
     return jsonify(results), 200
 
 @app.route('/get_sentiment_by_hour', methods=['GET'])
 def get_sentiment_by_hour():
-    tweets = load_tweets()
-    if not tweets:
+    snap = tweet_store.snapshot()
+    if not len(snap.table):
         return jsonify({"error": "No tweets available"}), 404
 
-    try:
-        tweets_sorted = sorted(tweets, key=lambda t: parse_timestamp(t['timestamp']))
-    except Exception:
-        tweets_sorted = tweets
-
-    groups = {}
-    for tweet in tweets_sorted:
-        dt = parse_timestamp(tweet['timestamp'])
-        if dt is None:
-            continue
-        bucket = dt.replace(minute=0, second=0, microsecond=0)
-        key = bucket.isoformat()
-        groups.setdefault(key, []).append(tweet)
-
-    def compute_combined_sentiment(current_tweets, historical_tweets):
-        default_sentiment = {
-            "normalized_overall_weighted_sentiment_score": 50,
-            "overall_weighted_sentiment_score": 0,
-            "total_tweets": 0
-        }
-        from_current = compute_sentiment(current_tweets) or default_sentiment
-        from_history = compute_sentiment(historical_tweets) if historical_tweets else None
-
-        if not from_history:
-            return from_current
-
-        c_norm = from_current.get("normalized_overall_weighted_sentiment_score", 50)
-        h_norm = from_history.get("normalized_overall_weighted_sentiment_score", 50)
-        combined_norm = 0.7 * h_norm + 0.3 * c_norm
-
-        c_ov = from_current.get("overall_weighted_sentiment_score", 0)
-        h_ov = from_history.get("overall_weighted_sentiment_score", 0)
-        combined_ov = 0.7 * h_ov + 0.3 * c_ov
-
-        return {
-            "historical_sentiment": from_history,
-            "current_bucket_sentiment": from_current,
-            "combined_overall_weighted_sentiment_score": combined_ov,
-            "combined_normalized_overall_weighted_sentiment_score": combined_norm,
-            "total_tweets": from_history.get("total_tweets", 0) + from_current.get("total_tweets", 0)
-        }
-
-    results = {}
-    for bucket_key, bucket_tweets in groups.items():
-        bucket_start = parse_timestamp(bucket_key)
-        historical_tweets = [t for t in tweets_sorted if parse_timestamp(t['timestamp']) < bucket_start]
-        combined_senti = compute_combined_sentiment(bucket_tweets, historical_tweets)
-        results[bucket_key] = combined_senti
-
+    results = sentiment_by_bucket(snap, HOUR_US)
     return jsonify(results), 200
 
 # ---------------- UPDATED /get_sentiment_iterations ENDPOINT ----------------
 
 @app.route('/get_sentiment_iterations', methods=['GET'])
 def get_sentiment_iterations():
-    tweets = load_tweets()
-    if not tweets:
+    snap = tweet_store.snapshot()
+    if not len(snap.table):
         return jsonify({"error": "No tweets available"}), 404
 
     ts_str = request.args.get("timestamp")
@@ -418,16 +821,13 @@ def get_sentiment_iterations():
     minute_bucket = (target_time.minute // 5) * 5
     target_bucket = target_time.replace(minute=minute_bucket)
 
-    try:
-        tweets_sorted = sorted(tweets, key=lambda t: parse_timestamp(t['timestamp']))
-    except Exception:
-        tweets_sorted = tweets
+    index = snap.index
 
     iterations = 1000
     results = {}
     for i in range(iterations):
         bucket_end = target_bucket - timedelta(minutes=5 * i)
-        decayed_senti = compute_time_decay_sentiment_up_to(tweets_sorted, bucket_end)
+        decayed_senti = index.decay_sentiment_up_to(bucket_end)
         if decayed_senti is None:
             decayed_senti = {
                 "start": None,
@@ -454,11 +854,18 @@ def get_tweets_by_user():
     if not username:
         return jsonify({"error": "Please provide a 'user' parameter"}), 400
 
-    tweets = load_tweets()
-    if not tweets:
+    snap = tweet_store.snapshot()
+    if not len(snap.table):
         return jsonify({"error": "No tweets available"}), 404
 
-    filtered = [t for t in tweets if t.get("user", "").lower() == username.lower()]
+    # Pick the user's rows by user code, then read only those tweets
+    def user_rows(table):
+        codes = [code for code, user in enumerate(table.users) if isinstance(user, str) and user.lower() == username.lower()]
+        return np.flatnonzero(np.isin(table.user_codes, codes))
+
+    filtered = read_tweets(user_rows)
+    if filtered is None:
+        return tweets_unavailable()
     if not filtered:
         return jsonify({"message": f"No tweets found for user '{username}'"}), 404
 
@@ -474,16 +881,13 @@ def search_tweets():
     if not keyword:
         return jsonify({"error": "Please provide a 'keyword' parameter"}), 400
 
-    tweets = load_tweets()
-    if not tweets:
+    snap = tweet_store.snapshot()
+    if not len(snap.table):
         return jsonify({"error": "No tweets available"}), 404
 
-    results = []
-    for t in tweets:
-        text = t.get("text", "")
-        if keyword in text.lower():
-            results.append(t)
-
+    results = read_tweets(lambda table: np.arange(len(table)), keep=lambda t: keyword in t.get("text", "").lower())
+    if results is None:
+        return tweets_unavailable()
     if not results:
         return jsonify({"message": f"No tweets found containing '{keyword}'"}), 404
 
@@ -494,26 +898,20 @@ def get_top_users_by_likes():
     """
     Returns top 10 users by total likes across all tweets.
     """
-    tweets = load_tweets()
-    if not tweets:
+    snap = tweet_store.snapshot()
+    if not len(snap.table):
         return jsonify({"error": "No tweets available"}), 404
 
-    user_likes = {}
-    for t in tweets:
-        user = t.get("user", "unknown")
-        likes_str = t.get("likes", "0")  # "likes" is a string in your JSON
-        try:
-            likes = int(likes_str)
-        except:
-            likes = 0
-        user_likes[user] = user_likes.get(user, 0) + likes
+    # Sum likes per user; users are coded in order of first appearance
+    table = snap.table
+    user_likes = np.zeros(len(table.users), dtype=np.int64)
+    np.add.at(user_likes, table.user_codes, table.likes)
 
-    # Sort by total likes desc
-    sorted_users = sorted(user_likes.items(), key=lambda x: x[1], reverse=True)
-    top_10 = sorted_users[:10]
+    # Sort by total likes desc (stable, so ties keep first-appearance order)
+    top_10 = np.argsort(-user_likes, kind="stable")[:10]
 
     # Return as a list of dict
-    result = [{"user": user, "total_likes": likes} for user, likes in top_10]
+    result = [{"user": table.users[u], "total_likes": int(user_likes[u])} for u in top_10]
     return jsonify(result), 200
 
 @app.route('/get_top_tweets_by_retweets', methods=['GET'])
@@ -521,25 +919,14 @@ def get_top_tweets_by_retweets():
     """
     Returns top 10 tweets by retweets (the highest retweets).
     """
-    tweets = load_tweets()
-    if not tweets:
+    snap = tweet_store.snapshot()
+    if not len(snap.table):
         return jsonify({"error": "No tweets available"}), 404
 
-    # Parse retweets as int
-    for t in tweets:
-        retweets_str = t.get("retweets", "0")
-        try:
-            t["retweets_int"] = int(retweets_str)
-        except:
-            t["retweets_int"] = 0
-
-    # Sort by retweets desc
-    sorted_tweets = sorted(tweets, key=lambda x: x["retweets_int"], reverse=True)
-    top_10 = sorted_tweets[:10]
-
-    # Remove the temporary "retweets_int" field
-    for t in top_10:
-        t.pop("retweets_int", None)
+    # Sort by retweets desc (stable, so ties keep file order)
+    top_10 = read_tweets(lambda table: np.argsort(-table.retweets, kind="stable")[:10])
+    if top_10 is None:
+        return tweets_unavailable()
 
     return jsonify(top_10), 200
 
@@ -36,6 +36,19 @@ app.register_blueprint(closetrades_bp, url_prefix="/closetrades")
 from app.routes.journal import journal_bp
 app.register_blueprint(journal_bp, url_prefix="/journal")
 
+# Sync the Bybit clock in the background before the first signed request
+from app.utils.bybit_clock import server_clock
+server_clock.start()
+
+# Indexes for the shared trades collection
+from app.utils.trade_store import ensure_trade_indexes, migrate_user_trades_command
+ensure_trade_indexes(mongo.db)
+
+# CLI: flask rebuild-journals, flask migrate-user-trades
+from app.utils.journal_stats import rebuild_journals_command
+app.cli.add_command(rebuild_journals_command)
+app.cli.add_command(migrate_user_trades_command)
+
 @app.route("/")
 def home():
     return {"message": "Flask Backend is Running!"}
@@ -1,6 +1,7 @@
 from flask import Blueprint, request, jsonify
 from flask_cors import CORS
 from app import bcrypt, mongo
+from app.utils.journal_stats import empty_journal
 from flask_jwt_extended import create_access_token
 from datetime import timedelta
 import re
@@ -85,15 +86,7 @@ def signup():
     user_id = str(user_result.inserted_id)  # Convert MongoDB ObjectId to string
 
     # Create corresponding journal entry for the new user
-    journal_data = {
-        "User_Id": user_id,  # String user ID for easy reference
-        "Total_Signals": 0,
-        "Signals_Closed_in_Profit": 0,
-        "Signals_Closed_in_Loss": 0,
-        "Current_Running_Signals": 0,
-        "Avg_Profit_USDT": 0.0,
-        "Avg_Loss_USDT": 0.0
-    }
+    journal_data = empty_journal(user_id)  # String user ID for easy reference
     mongo.db.journals.insert_one(journal_data)
 
     return jsonify({"message": "User created successfully"}), 201
@@ -1,16 +1,18 @@
 import os
 import time
-import hmac
 import math
-import hashlib
 import requests
-import urllib.parse
+import threading
 from bson import ObjectId
 from flask_cors import CORS
 from dotenv import load_dotenv
-from pymongo import MongoClient
+from pymongo import MongoClient, UpdateOne
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from flask import Blueprint, request, jsonify
+from app.utils.bybit_client import signed_get
+from app.utils.journal_stats import record_trades_closed
+from app.utils.trade_store import TRADES_COLLECTION
 
 from pprint import pprint
 
@@ -23,23 +25,33 @@ BASE_URL = os.getenv("BASE_URL")
 CLOSEPNL_ENDPOINT= os.getenv("CLOSE_PNL")
 MONGO_URI = os.getenv("MONGO_URI")
 MONGO_DB = os.getenv("MONGO_DB")
-TIME_ENDPOINT=os.getenv("TIME_ENDPOINT")
 # MongoDB connection and collections
 client = MongoClient(MONGO_URI)
 db = client[MONGO_DB]
 subscriptions_collection = db['subscriptions']
 users_collection = db['users']
+trades_collection = db[TRADES_COLLECTION]
 recv_window = "10000"
+# Closed-PnL reconciliation: first poll after CLOSE_PNL_FIRST_POLL seconds,
+# doubling up to CLOSE_PNL_MAX_DELAY, giving up after CLOSE_PNL_TIMEOUT
+CLOSE_PNL_FIRST_POLL = float(os.getenv("CLOSE_PNL_FIRST_POLL", "3"))
+CLOSE_PNL_MAX_DELAY = float(os.getenv("CLOSE_PNL_MAX_DELAY", "30"))
+CLOSE_PNL_TIMEOUT = float(os.getenv("CLOSE_PNL_TIMEOUT", "300"))
+CLOSE_POLL_WORKERS = int(os.getenv("CLOSE_POLL_WORKERS", "16"))
+# Recent trade IDs each balance document remembers as already applied
+SETTLED_TRADES_KEPT = 500
+PROCESS_STARTED_AT = datetime.now(timezone.utc)
 
 # ------------------------------------------------------------------------------
 # Helper Functions (Single Responsibility)
 # ------------------------------------------------------------------------------
 
-def find_user_by_id(user_id_str):
+def find_users_by_ids(user_ids):
     """
-    Find and return a user document by its ID.
+    Find all user documents for the given IDs in one query, keyed by ID string.
     """
-    return users_collection.find_one({"_id": ObjectId(user_id_str)})
+    ids = [ObjectId(u) for u in set(user_ids) if u and ObjectId.is_valid(u)]
+    return {str(u["_id"]): u for u in users_collection.find({"_id": {"$in": ids}})}
 
 def get_subscriptions_by_symbol(symbol):
     """
@@ -47,13 +59,6 @@ def get_subscriptions_by_symbol(symbol):
     """
     return subscriptions_collection.find({"symbol": symbol})
 
-def get_user_trade_collection(user_id):
-    """
-    Retrieve the user's trade collection based on the user ID.
-    """
-    collection_name = f"user_{user_id}"
-    return db[collection_name]
-
 #def find_open_trade(trade_collection, symbol, direction):
     # """
     # Find an open trade in the user's trade collection matching the cleaned symbol and direction.
@@ -65,45 +70,63 @@ def get_user_trade_collection(user_id):
     #     "status": "OPEN"
     # })
 
-def find_open_trade(trade_collection, symbol, direction):
+def find_open_trades(trade_collection, user_ids, symbol, direction):
     """
-    Find the latest open trade using find_one with sorting.
+    Find each user's latest open trade for the symbol and direction in one query.
     """
     clean_symbol = symbol.replace("/", "")
-    return trade_collection.find_one(
+    cursor = trade_collection.find(
         {
+            "user_id": {"$in": list(user_ids)},
             "symbol": clean_symbol,
             "direction": direction,
             "status": "OPEN"
-        },
-        sort=[("entry_time", -1)] 
-    )
-
-def update_trade_status(trade_collection, trade_id, reason, pnl=None):
+        }
+    ).sort("entry_time", -1)
+    trades = {}
+    for trade in cursor:
+        trades.setdefault(trade["user_id"], trade)
+    return trades
+
+def trade_status_update(job, pnl=None):
     """
-    Update a trade document to mark it as closed with a given reason,
-    exit time, and optional PNL.
+    Build the bulk update that closes a CLOSING trade with the job's reason,
+    exit time (defaults to now), and optional PNL. It only matches while the
+    trade still carries the job's close token, so a trade is settled once
+    however many reconcilers hold it; the job's settle token it leaves
+    behind tells the caller which trades it actually closed.
     """
-    exit_time = datetime.now(timezone.utc)
-    update_fields = {}
+    update_fields = {"close_token": job["settle_token"]}
 
-    if reason:
-        update_fields["status"] = reason
-    update_fields["exit_time"] = exit_time
+    if job["reason"]:
+        update_fields["status"] = job["reason"]
+    update_fields["exit_time"] = job["requested_at"] or datetime.now(timezone.utc)
 
     if pnl is not None:
         update_fields["PNL"] = pnl 
 
-    if not update_fields:
-        raise ValueError("No fields to update. Update path is empty.")
-
     #print(f"[DEBUG] Updating trade with: {update_fields}")
 
-    trade_collection.update_one(
-        {"_id": trade_id},
-        {"$set": update_fields}
+    return UpdateOne(
+        {"_id": job["trade_id"], "status": "CLOSING", "close_token": job["close_token"]},
+        {"$set": update_fields, "$unset": {"close_reason": "", "close_symbol": "", "close_requested_at": ""}}
+    )
+
+def mark_trades_closing(trade_collection, trade_ids, reason, symbol):
+    """
+    Flag open trades as CLOSING until their closed PnL has been reconciled.
+    Returns the time the close was requested, the close token stamped on
+    the flagged trades and the IDs actually flagged; trades no longer OPEN
+    (e.g. a duplicate close signal got there first) are left out.
+    """
+    requested_at = datetime.now(timezone.utc)
+    token = ObjectId()
+    trade_collection.update_many(
+        {"_id": {"$in": trade_ids}, "status": "OPEN"},
+        {"$set": {"status": "CLOSING", "close_reason": reason, "close_symbol": symbol, "close_requested_at": requested_at, "close_token": token}}
     )
-    return exit_time
+    marked = trade_collection.find({"_id": {"$in": trade_ids}, "close_token": token}, {"_id": 1})
+    return requested_at, token, {t["_id"] for t in marked}
 
 def log_user_keys(user):
     """
@@ -125,48 +148,9 @@ def get_current_timestamp() -> str:
     """
     return str(int(time.time() * 1000))
 
-def get_server_timestamp(base_url: str) -> int:
-    """
-    Retrieve the server timestamp from the market time endpoint.
-    """
-    try:
-        response = requests.get(f"{base_url}{TIME_ENDPOINT}")  
-        if response.status_code == 200:
-            return int(response.json()['result']['timeNano']) // 1_000_000
-    except Exception as e:
-        print("[WARNING] Fallback to local time due to error getting server time:", str(e))
-    return int(time.time() * 1000)
-
-
-def generate_signature(api_secret: str, timestamp: str, api_key: str, recv_window: str, params: dict) -> tuple[str, str]:
-    ...
-
-    """
-    Generate HMAC SHA256 signature and return it along with the URL-encoded query string.
-    """
-    query_string = urllib.parse.urlencode(params)
-    string_to_sign = f"{timestamp}{api_key}{recv_window}{query_string}"
-    signature = hmac.new(
-        api_secret.encode("utf-8"),
-        string_to_sign.encode("utf-8"),
-        hashlib.sha256
-    ).hexdigest()
-    return signature, query_string
-
-def build_headers(api_key: str, timestamp: str, recv_window: str, signature: str) -> dict:
-    """
-    Construct headers required for the API request.
-    """
-    return {
-        "X-BAPI-API-KEY": api_key,
-        "X-BAPI-TIMESTAMP": timestamp,
-        "X-BAPI-RECV-WINDOW": recv_window,
-        "X-BAPI-SIGN": signature
-    }
-
 def fetch_closed_pnl(api_key: str, api_secret: str, base_url: str, endpoint: str, symbol: str, recv_window: str):
     """
-    Build the request URL with the hardcoded "linear" category and send a GET request.
+    Send a signed GET request for closed PnL with the hardcoded "linear" category.
     
     Returns:
         response (requests.Response): The API response.
@@ -176,12 +160,7 @@ def fetch_closed_pnl(api_key: str, api_secret: str, base_url: str, endpoint: str
         "category": "linear", 
         "symbol": symbol
     }
-    #timestamp = get_current_timestamp()
-    timestamp = str(get_server_timestamp(base_url))
-    signature, query_string = generate_signature(api_secret, timestamp, api_key, recv_window, params)
-    headers = build_headers(api_key, timestamp, recv_window, signature)
-    url = f"{base_url}{endpoint}?{query_string}"
-    return requests.get(url, headers=headers)
+    return signed_get(endpoint, params, api_key, api_secret, recv_window, base_url=base_url)
 
 def truncate_to_one_decimal(value: float) -> float:
     """
@@ -191,7 +170,20 @@ def truncate_to_one_decimal(value: float) -> float:
     """
     return math.floor(value * 10) / 10
 
-def process_response(response, direction):
+def to_epoch_ms(value):
+    """
+    Convert a stored trade timestamp (datetime or ISO string) to epoch ms.
+    """
+    try:
+        if isinstance(value, str):
+            value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return int(value.timestamp() * 1000)
+    except Exception:
+        return None
+
+def process_response(response, direction, since_ms=None):
     #print("\n[DEBUG] Entered process_response function")
     data = None
 
@@ -234,6 +226,9 @@ def process_response(response, direction):
 
         # Filter trades
         filtered_trades = [t for t in results if t.get("side", "").lower() == match_side.lower()]
+        # Ignore closed PnL records from earlier trades
+        if since_ms is not None:
+            filtered_trades = [t for t in filtered_trades if int(t.get("updatedTime", 0)) >= since_ms]
         #print(f"[DEBUG] Number of trades matching side '{match_side}': {len(filtered_trades)}")
 
         if not filtered_trades:
@@ -270,42 +265,190 @@ def process_response(response, direction):
         print(f"[✖] retCode not 0. retMsg: {data.get('retMsg')}")
         return f"Error: {data.get('retMsg')}"
 
-def update_balances(user_id, pnl, symbol):
+def balance_update(field, pnl, trade_id):
     """
-    Update bot_current_balance (min 0) and user_current_balance (min 0)
-    after trade closure.
+    Atomic update adding pnl to a balance field, floored at 0, and
+    recording the trade in settled_trades (an aggregation-pipeline update,
+    so there is no read-modify-write).
     """
-    try:
-        # Update subscription balance
-        subscription = subscriptions_collection.find_one({"user_id": str(user_id), "symbol": symbol})
-        if subscription:
-            current_bot_balance = subscription.get("bot_current_balance", 0)
-            new_bot_balance = max(0, current_bot_balance + pnl)  
-
-            subscriptions_collection.update_one(
-                {"_id": subscription["_id"]},
-                {"$set": {"bot_current_balance": new_bot_balance}}
-            )
-        else:
-            print(f"[⚠] Subscription not found for user_id: {user_id}, symbol: {symbol}")
+    return [{"$set": {
+        field: {"$max": [0, {"$add": [{"$ifNull": [f"${field}", 0]}, pnl]}]},
+        "settled_trades": {"$slice": [{"$concatArrays": [{"$ifNull": ["$settled_trades", []]}, [trade_id]]}, -SETTLED_TRADES_KEPT]}
+    }}]
 
-        # Update user balance
-        user = users_collection.find_one({"_id": ObjectId(user_id)})
-        if user:
-            current_user_balance = user.get("user_current_balance", 0)
-            new_user_balance = max(0, current_user_balance + pnl)  
+def update_balances(collection, field, match, settled):
+    """
+    Apply each settled trade's PnL to `field` (min 0) of the document
+    matched by match(job), in one bulk write. Documents that already list
+    the trade in settled_trades are skipped, so a retry after a partial or
+    unacknowledged write applies only what is missing. Returns settled.
+    """
+    ops = [
+        UpdateOne({**match(job), "settled_trades": {"$ne": str(job["trade_id"])}}, balance_update(field, pnl_value, str(job["trade_id"])))
+        for job, pnl_value, _ in settled if pnl_value is not None
+    ]
+    if ops:
+        result = collection.bulk_write(ops, ordered=False)
+        if result.matched_count < len(ops):
+            print(f"[⚠] {len(ops) - result.matched_count} document(s) in {collection.name} not found or already updated for {field}")
+    return settled
+
+def update_bot_balances(settled):
+    return update_balances(subscriptions_collection, "bot_current_balance", lambda job: {"user_id": str(job["user_id"]), "symbol": job["symbol"]}, settled)
+
+def update_user_balances(settled):
+    settled = update_balances(users_collection, "user_current_balance", lambda job: {"_id": ObjectId(job["user_id"])}, settled)
+    print(f"✅ Balance update completed successfully for {len(settled)} user(s)")
+    return settled
 
-            users_collection.update_one(
-                {"_id": ObjectId(user_id)},
-                {"$set": {"user_current_balance": new_user_balance}}
-            )
-        else:
-            print(f"[⚠] User not found in users_collection with ID: {user_id}")
+# ------------------------------------------------------------------------------
+# Closed-PnL Reconciliation (runs off the request thread)
+# ------------------------------------------------------------------------------
+poll_executor = ThreadPoolExecutor(max_workers=CLOSE_POLL_WORKERS, thread_name_prefix="close_pnl")
+resume_lock = threading.Lock()
+resume_started = False
 
-        print(f"✅ Balance update completed successfully for user_id: {user_id}")
+def parse_pnl(result):
+    """
+    Extract the PnL value from a process_response summary string, or None.
+    """
+    if not result.startswith("Symbol:"):
+        return None
+    parts = result.split(", ")
+    parsed_data = {k.strip(): v.strip() for k, v in (item.split(":") for item in parts)}
+    return float(parsed_data.get("PnL", 0))
 
+def poll_closed_pnl(job):
+    """
+    Query Bybit once for this job's closed PnL. Returns (pnl, summary);
+    pnl is None while the record has not appeared yet.
+    """
+    try:
+        response = fetch_closed_pnl(job["api_key"], job["api_secret"], BASE_URL, CLOSEPNL_ENDPOINT, job["symbol"], recv_window)
+        result = process_response(response, job["direction"], since_ms=job["since_ms"])
+        return parse_pnl(result), result
     except Exception as e:
-        print(f"[✖] Exception during balance update for user_id: {user_id} -> {str(e)}")
+        print(f"Error polling closed PnL for user {job['user_id']}: {str(e)}")
+        return None, f"Error: {str(e)}"
+
+def close_trades(settled):
+    """
+    Move the trades out of CLOSING in one bulk write and return the
+    (job, pnl_value, result) tuples whose trade this job closed. The
+    settle token is kept on the job, so a retry after a partial write
+    still finds the trades the earlier attempt closed.
+    """
+    for job, _, _ in settled:
+        job.setdefault("settle_token", ObjectId())
+    trades_collection.bulk_write(
+        [trade_status_update(job, pnl=pnl_value) for job, pnl_value, _ in settled],
+        ordered=False
+    )
+    tokens = {t["_id"]: t.get("close_token") for t in trades_collection.find(
+        {"_id": {"$in": [job["trade_id"] for job, _, _ in settled]}}, {"close_token": 1}
+    )}
+    closed = {job["trade_id"] for job, _, _ in settled if tokens.get(job["trade_id"]) == job["settle_token"]}
+    for job, _, _ in settled:
+        if job["trade_id"] not in closed:
+            print(f"[⚠] Trade {job['trade_id']} for user {job['user_id']} was already settled, skipping")
+    return [s for s in settled if s[0]["trade_id"] in closed]
+
+def record_journals(settled):
+    for job, pnl_value, result in settled:
+        if pnl_value is None:
+            print(f"Process response failed for user {job['user_id']}: {result}")
+    record_trades_closed(db, [(job["user_id"], job["reason"], pnl_value, job["trade_id"]) for job, pnl_value, _ in settled])
+    return settled
+
+# Settling runs these steps in order, each one bulk write over the batch
+SETTLE_STEPS = (
+    ("close", close_trades),
+    ("journal", record_journals),
+    ("bot_balance", update_bot_balances),
+    ("user_balance", update_user_balances),
+)
+
+def settle_trades(settled):
+    """
+    Close the trades with their reconciled PnL (or none if it never
+    appeared), then update the journals and apply the PnL to the balances
+    for the trades that were still CLOSING. settled: (job, pnl_value,
+    result) tuples. If a step fails, its tuples are returned for the next
+    round with job["settle_step"] set, so completed steps are not repeated;
+    each step is idempotent per trade, so a partly applied one can be.
+    """
+    retry = []
+    batch = []
+    for step, apply in SETTLE_STEPS:
+        batch = batch + [s for s in settled if s[0].get("settle_step", "close") == step]
+        if not batch:
+            continue
+        try:
+            batch = apply(batch)
+        except Exception as e:
+            print(f"[✖] Error in settle step '{step}' for {len(batch)} trade(s), retrying next round: {str(e)}")
+            for job, _, _ in batch:
+                job["settle_step"] = step
+            retry.extend(batch)
+            batch = []
+    return retry
+
+def reconcile_closing_trades(jobs):
+    """
+    Poll closed PnL for all pending jobs concurrently, backing off between
+    rounds, and settle each trade as soon as its record appears. Trades
+    still unmatched after CLOSE_PNL_TIMEOUT are closed without PnL.
+    Trades whose settle failed are retried each round with the PnL already
+    found.
+    """
+    delay = CLOSE_PNL_FIRST_POLL
+    deadline = time.monotonic() + CLOSE_PNL_TIMEOUT
+    retry = []
+    while jobs or retry:
+        time.sleep(delay)
+        final_round = time.monotonic() >= deadline
+        pending = []
+        settled = retry
+        for job, (pnl_value, result) in zip(jobs, poll_executor.map(poll_closed_pnl, jobs)):
+            if pnl_value is not None or final_round:
+                settled.append((job, pnl_value, result))
+            else:
+                pending.append(job)
+        retry = settle_trades(settled)
+        jobs = pending
+        delay = min(delay * 2, CLOSE_PNL_MAX_DELAY)
+
+def start_reconciliation(jobs):
+    if jobs:
+        threading.Thread(target=reconcile_closing_trades, args=(jobs,), name="close_reconcile", daemon=True).start()
+
+def build_close_job(user_id, user, trade, symbol, reason, requested_at, close_token):
+    return {
+        "user_id": user_id,
+        "api_key": user.get("api_key"),
+        "api_secret": user.get("secret_key"),
+        "symbol": symbol,
+        "direction": trade["direction"],
+        "trade_id": trade["_id"],
+        "reason": reason,
+        "requested_at": requested_at,
+        "close_token": close_token,
+        "since_ms": to_epoch_ms(trade.get("entry_time"))
+    }
+
+def resume_closing_trades():
+    """
+    Pick up trades left in CLOSING by a previous process. Trades flagged
+    since this process started belong to its own close requests.
+    """
+    trades = list(trades_collection.find({"status": "CLOSING", "close_requested_at": {"$lt": PROCESS_STARTED_AT}}))
+    users = find_users_by_ids(trade["user_id"] for trade in trades)
+    jobs = []
+    for trade in trades:
+        user = users.get(trade["user_id"])
+        if user:
+            jobs.append(build_close_job(trade["user_id"], user, trade, trade.get("close_symbol", trade["symbol"]), trade.get("close_reason"), trade.get("close_requested_at"), trade.get("close_token")))
+    start_reconciliation(jobs)
 
 # ------------------------------------------------------------------------------
 # Flask Blueprint Setup
@@ -313,6 +456,22 @@ def update_balances(user_id, pnl, symbol):
 closetrades_bp = Blueprint('closetrades', __name__)
 CORS(closetrades_bp)
 
+@closetrades_bp.before_app_request
+def resume_on_first_request():
+    """
+    Resume reconciliation once, from the process that serves requests
+    rather than every process importing the app (the reloader parent,
+    flask CLI commands).
+    """
+    global resume_started
+    if resume_started:
+        return
+    with resume_lock:
+        if resume_started:
+            return
+        resume_started = True
+    threading.Thread(target=resume_closing_trades, daemon=True).start()
+
 # -------------------------------------------------------------------
 # close_trade Route
 # -------------------------------------------------------------------
@@ -331,78 +490,57 @@ def close_trade():
     if not subscriptions:
         return jsonify({"message": f"No subscriptions found for the provided {symbol}"}), 404
 
-    results = []
+    # Step 2: Load all subscribed users, then their latest open trades, one query each
+    users = find_users_by_ids(subscription.get("user_id") for subscription in subscriptions)
+    open_trades = find_open_trades(trades_collection, users.keys(), symbol, direction)
 
+    # Step 3: Check every subscription; results keep subscription order
+    results = []
+    to_close = []  # (result index, user_id, user, trade)
+    claimed = set()
     for subscription in subscriptions:
         user_id = subscription.get("user_id")
-        
-        # Step 2: Get user document
-        user = find_user_by_id(user_id)
+        user = users.get(user_id)
         if not user:
             results.append({"user_id": user_id, "status": "error", "message": "User not found"})
             continue
 
-        # Step 3: Get user's trade collection
-        user_trade_collection = get_user_trade_collection(user_id)
-        if user_trade_collection.name not in db.list_collection_names():
-            results.append({"user_id": user_id, "status": "error", "message": "Trade collection not found"})
+        trade = open_trades.get(user_id)
+        if not trade or trade["_id"] in claimed:
+            results.append({"user_id": user_id, "status": "error", "message": "Open trade not found"})
             continue
 
-        # Step 4: Find open trade
-        trade = find_open_trade(user_trade_collection, symbol, direction)
-        if not trade:
-            results.append({"user_id": user_id, "status": "error", "message": "Open trade not found"})
+        if not trade.get("entry_price"):
+            results.append({"user_id": user_id, "status": "error", "message": "Entry price missing"})
             continue
 
-        # Step 5: Process trade closure
+        claimed.add(trade["_id"])
+        to_close.append((len(results), user_id, user, trade))
+        results.append(None)
+
+    # Step 4: Mark the trades CLOSING in one update; PnL and balances are settled in the background
+    jobs = []
+    if to_close:
         try:
-            entry_price = trade.get("entry_price")
-            if not entry_price:
-                results.append({"user_id": user_id, "status": "error", "message": "Entry price missing"})
-                continue
-
-           
-
-            # Step 6: Fetch closed PnL from Bybit
-            api_key = user.get("api_key")
-            api_secret = user.get("secret_key")
-            time.sleep(10) 
-            response = fetch_closed_pnl(api_key, api_secret, BASE_URL, CLOSEPNL_ENDPOINT, symbol, recv_window)
-            result = process_response(response, direction)
-
-            # Step 7: Parse PnL
-            pnl_value = None
-            if result.startswith("Symbol:"):
-                try:
-                    parts = result.split(", ")
-                    parsed_data = {k.strip(): v.strip() for k, v in (item.split(":") for item in parts)}
-                    pnl_value = float(parsed_data.get("PnL", 0))
-                except Exception as e:
-                    print(f"Error parsing PnL for user {user_id}: {str(e)}")
-                    pnl_value = None
+            requested_at, close_token, marked = mark_trades_closing(trades_collection, [trade["_id"] for _, _, _, trade in to_close], reason, symbol)
+        except Exception as e:
+            requested_at, close_token, marked = None, None, set()
+            error = f"Error processing trade: {str(e)}"
+        for index, user_id, user, trade in to_close:
+            if trade["_id"] in marked:
+                jobs.append(build_close_job(user_id, user, trade, symbol, reason, requested_at, close_token))
+                results[index] = {
+                    "user_id": user_id,
+                    "status": "closing",
+                    "exit_time": requested_at.isoformat()
+                }
+            elif requested_at is None:
+                results[index] = {"user_id": user_id, "status": "error", "message": error}
             else:
-                print(f"Process response failed for user {user_id}: {result}")
+                results[index] = {"user_id": user_id, "status": "error", "message": "Open trade not found"}
 
-            # Step 8: Update trade status
-            exit_time = update_trade_status(user_trade_collection, trade["_id"], reason, pnl=pnl_value)
-
-            # Step 9: Update balances
-            if pnl_value is not None:
-                update_balances(user_id, pnl_value, symbol)
-
-            results.append({
-                "user_id": user_id,
-                "status": "success",
-                "exit_time": exit_time.isoformat(),
-                "pnl_result": result
-            })
-
-        except Exception as e:
-            results.append({
-                "user_id": user_id,
-                "status": "error",
-                "message": f"Error processing trade: {str(e)}"
-            })
+    # Step 5: Poll closed PnL for all users concurrently and settle balances
+    start_reconciliation(jobs)
 
     return jsonify({
         "message": "Batch processing completed for close trade",
@@ -2,17 +2,14 @@ import os
 from dotenv import load_dotenv
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-import requests
-import hmac
-import hashlib
 import base64
 from datetime import datetime, UTC
 from urllib.parse import urljoin
 from flask_cors import CORS
 from app import mongo
 from bson.objectid import ObjectId
-import time
 from bson import ObjectId
+from app.utils.bybit_client import signed_get
 
 # ===============================
 # Load environment variables
@@ -23,7 +20,6 @@ load_dotenv()
 # Read Bybit API endpoint and resource URIs from environment variables
 BASE_URL = os.getenv("BASE_URL")
 WALLETENDPOINT = os.getenv("WALLETENDPOINT")
-TIME_ENDPOINT = os.getenv("TIME_ENDPOINT")
 
 # ===============================
 # Blueprint and CORS Setup
@@ -33,65 +29,19 @@ exchange_bp = Blueprint('exchange', __name__)
 # Enable CORS for all routes in this blueprint (allow cross-origin requests)
 CORS(exchange_bp)
 
-# ===============================
-# Utility Function: Get Server Timestamp
-# ===============================
-def get_server_timestamp():
-    """
-    Get the current server timestamp from Bybit API, in milliseconds.
-    Falls back to local system time in case of error.
-    This is important for request signature validity to avoid time drift issues.
-    """
-    try:
-        response = requests.get(f"{BASE_URL}{TIME_ENDPOINT}")
-        if response.status_code == 200:
-            data = response.json()
-            # Bybit returns time in nanoseconds; convert to milliseconds
-            return int(data["result"]["timeNano"]) // 1_000_000
-    except Exception as e:
-        print(f"Error fetching server time: {e}")
-    # If any error, use local system time (milliseconds)
-    return int(time.time() * 1000)
-
 # ===============================
 # Utility Function: Get USDT Balance
 # ===============================
 def get_usdt_balance(api_key, api_secret):
     """
     Call the Bybit API to get the user's USDT wallet balance.
-    Uses HMAC SHA256 signature for authentication.
     Returns the wallet balance as float, or -1 if failed/not found.
     """
     # Only unified account type is currently supported
     params = {"accountType": "UNIFIED"}
 
-    # Always use Bybit server time for signature
-    timestamp = str(get_server_timestamp())
-    recv_window = "10000"
-
-    # Prepare sorted query string for signing (alphabetical order)
-    query_string = '&'.join(f"{k}={v}" for k, v in sorted(params.items()))
-
-    # Signature format required by Bybit API
-    signature_payload = f"{timestamp}{api_key}{recv_window}{query_string}"
-
-    # Calculate HMAC SHA256 signature using API secret
-    signature = hmac.new(
-        api_secret.encode("utf-8"),
-        signature_payload.encode("utf-8"),
-        hashlib.sha256
-    ).hexdigest()
-
-    # Compose HTTP headers for Bybit API authentication
-    headers = {
-        "X-BAPI-API-KEY": api_key,
-        "X-BAPI-TIMESTAMP": timestamp,
-        "X-BAPI-RECV-WINDOW": recv_window,
-        "X-BAPI-SIGN": signature
-    }
-
-    # Make the authenticated GET request to Bybit
-    response = requests.get(f"{BASE_URL}{WALLETENDPOINT}", params=params, headers=headers)
+    # Authenticated GET through the shared Bybit client (signing, retries, rate limit)
+    response = signed_get(WALLETENDPOINT, params, api_key, api_secret)
 
     # Parse the JSON response for USDT balance
     if response.status_code == 200:
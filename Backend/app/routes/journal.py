@@ -5,6 +5,8 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from flask_cors import CORS
 from pymongo import MongoClient
 from bson import ObjectId
+from app.utils.journal_stats import journal_averages
+from app.utils.trade_store import TRADES_COLLECTION
 
 # ================================
 # Environment & MongoDB Connection
@@ -21,6 +23,7 @@ MONGO_DB = os.getenv("MONGO_DB")
 client = MongoClient(MONGO_URI)
 db = client[MONGO_DB]
 journal_collection = db['journals']
+trades_collection = db[TRADES_COLLECTION]
 
 # ============================
 # Flask Blueprint Setup
@@ -57,6 +60,7 @@ def journal():
 
         # 5. If journal exists, format and return response
         if journal_data:
+            avg_profit_usdt, avg_loss_usdt = journal_averages(journal_data)
             response = {
                 "success": True,
                 "message": "Journal data fetched successfully",
@@ -69,8 +73,8 @@ def journal():
                     "signals_closed_in_profit": journal_data.get("Signals_Closed_in_Profit", 0),
                     "signals_closed_in_loss": journal_data.get("Signals_Closed_in_Loss", 0),
                     "current_running_signals": journal_data.get("Current_Running_Signals", 0),
-                    "average_profit_usdt": journal_data.get("Avg_Profit_USDT", 0.0),
-                    "average_loss_usdt": journal_data.get("Avg_Loss_USDT", 0.0)
+                    "average_profit_usdt": avg_profit_usdt,
+                    "average_loss_usdt": avg_loss_usdt
                 }
             }
             return jsonify(response), 200
@@ -97,7 +101,7 @@ def journal():
 def opentrades():
     """
     Returns all OPEN trades for the current user.
-    JWT required. Looks up user's specific trade collection (user_{user_id}).
+    JWT required. Looks up the user's trades in the shared trades collection.
     """
     try:
         # 1. Get user ID from JWT token
@@ -108,18 +112,15 @@ def opentrades():
         if not user:
             return jsonify({"success": False, "message": "User not found"}), 404
 
-        # 3. Collection name for user's trades
-        user_trade_collection = db[f"user_{user_id}"]
-
-        # 4. Find all trades where status is OPEN
-        open_trades_cursor = user_trade_collection.find({"status": "OPEN"})
+        # 3. Find all of the user's trades where status is OPEN
+        open_trades_cursor = trades_collection.find({"user_id": str(user_id), "status": "OPEN"})
         open_trades = []
         for trade in open_trades_cursor:
             # Convert ObjectId to string for JSON serialization
             trade["_id"] = str(trade["_id"])
             open_trades.append(trade)
 
-        # 5. Build and return response
+        # 4. Build and return response
         response = {
             "success": True,
             "message": "Open trades fetched successfully",
@@ -143,7 +144,7 @@ def opentrades():
 def closetrades():
     """
     Returns all CLOSED trades (status 'TP' or 'SL') for the current user, sorted by exit_time descending.
-    JWT required. Uses user's individual trades collection.
+    JWT required. Uses the shared trades collection, filtered by user.
     """
     try:
         # 1. Get user ID from JWT token
@@ -154,12 +155,9 @@ def closetrades():
         if not user:
             return jsonify({"success": False, "message": "User not found"}), 404
 
-        # 3. Access user-specific trades collection
-        user_trade_collection = db[f"user_{user_id}"]
-
-        # 4. Find all trades where status is 'TP' (take profit) or 'SL' (stop loss), sort by exit_time descending
-        closed_trades_cursor = user_trade_collection.find(
-            {"status": {"$in": ["TP", "SL"]}}
+        # 3. Find all of the user's trades where status is 'TP' (take profit) or 'SL' (stop loss), sort by exit_time descending
+        closed_trades_cursor = trades_collection.find(
+            {"user_id": str(user_id), "status": {"$in": ["TP", "SL"]}}
         ).sort("exit_time", -1)
 
         closed_trades = []
@@ -167,7 +165,7 @@ def closetrades():
             trade["_id"] = str(trade["_id"])
             closed_trades.append(trade)
 
-        # 5. Build and return the response
+        # 4. Build and return the response
         response = {
             "success": True,
             "message": "Closed trades fetched successfully",
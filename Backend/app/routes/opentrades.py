@@ -1,16 +1,16 @@
 import os
-import time
-import hmac
-import hashlib
-import json
 import math
-import requests
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime, timezone
 from dotenv import load_dotenv
 from flask import Blueprint, request, jsonify
 from flask_cors import CORS
 from pymongo import MongoClient
 from bson import ObjectId
+from app.utils.bybit_client import signed_get, signed_post
+from app.utils.bybit_market import get_current_price, get_instrument_info
+from app.utils.journal_stats import record_trades_opened
+from app.utils.trade_store import TRADES_COLLECTION
 
 # ------------------------------------------------------------------------------
 # Environment and Database Setup
@@ -18,22 +18,22 @@ from bson import ObjectId
 load_dotenv()  # Load environment variables from .env file
 
 BASE_URL = os.getenv("BASE_URL")
-TIME_ENDPOINT = os.getenv("TIME_ENDPOINT")
 MONGO_URI = os.getenv("MONGO_URI")
 MONGO_DB = os.getenv("MONGO_DB")
-Tickers = os.getenv("Tickers")
-INSTUMENTS_INFO=os.getenv("INSTUMENTS_INFO")
 POSITION_LIST=os.getenv("POSITION_LIST")
 SET_LEVERAGE=os.getenv("SET_LEVERAGE")
 CREATE_ORDER=os.getenv("CREATE_ORDER")
 recv_window = '10000'
+# Per-user order pipelines run concurrently; the whole batch is bounded in time
+OPEN_TRADE_WORKERS = int(os.getenv("OPEN_TRADE_WORKERS", "16"))
+OPEN_TRADE_TIMEOUT = float(os.getenv("OPEN_TRADE_TIMEOUT", "20"))
 client = MongoClient(MONGO_URI)
 db = client[MONGO_DB]
 
 # MongoDB collections
 subscriptions_collection = db['subscriptions']
 users_collection = db['users']
-journal_collection=db['journals']
+trades_collection = db[TRADES_COLLECTION]
 
 # ------------------------------------------------------------------------------
 # Flask Blueprint Setup
@@ -41,79 +41,22 @@ journal_collection=db['journals']
 opentrades_bp = Blueprint('opentrades', __name__)
 CORS(opentrades_bp)
 
+# Shared across requests so concurrent signals cannot oversubscribe the exchange
+order_executor = ThreadPoolExecutor(max_workers=OPEN_TRADE_WORKERS, thread_name_prefix="open_trade")
+
 # ------------------------------------------------------------------------------
 # API Utility Functions
 # ------------------------------------------------------------------------------
-def get_server_timestamp(base_url: str) -> int:
-    """
-    Retrieve the server timestamp from the market time endpoint.
-    """
-    try:
-        response = requests.get(f"{base_url}{TIME_ENDPOINT}")
-        if response.status_code == 200:
-            data = response.json()
-            return int(data["result"]["timeNano"]) // 1_000_000
-        return int(time.time() * 1000)
-    except Exception:
-        return int(time.time() * 1000)
-
-def sign_payload(api_secret: str, timestamp: str, api_key: str, recv_window: str, json_payload: str) -> str:
-    """
-    Sign the payload using HMAC SHA256.
-    """
-    payload = f"{timestamp}{api_key}{recv_window}{json_payload}"
-    return hmac.new(api_secret.encode(), payload.encode(), hashlib.sha256).hexdigest()
-
 def send_post_request(base_url: str, endpoint: str, api_key: str, api_secret: str, recv_window: str, params: dict):
     """
     Send a POST request to the given endpoint with a signed payload.
     """
-    timestamp = str(get_server_timestamp(base_url))
-    sorted_params = dict(sorted(params.items()))
-    json_payload = json.dumps(sorted_params, separators=(',', ':'))
-    signature = sign_payload(api_secret, timestamp, api_key, recv_window, json_payload)
-    headers = {
-        "X-BAPI-API-KEY": api_key,
-        "X-BAPI-TIMESTAMP": timestamp,
-        "X-BAPI-RECV-WINDOW": recv_window,
-        "X-BAPI-SIGN": signature,
-        "Content-Type": "application/json"
-    }
-    return requests.post(f"{base_url}{endpoint}", data=json_payload, headers=headers)
-
-def generate_signature(api_key: str, api_secret: str, query_str: str, timestamp: str, recv_window: str) -> str:
-    """
-    Generate a signature for GET requests.
-    """
-    return hmac.new(api_secret.encode(), f'{timestamp}{api_key}{recv_window}{query_str}'.encode(), hashlib.sha256).hexdigest()
+    return signed_post(endpoint, params, api_key, api_secret, recv_window, base_url=base_url)
 
 # ------------------------------------------------------------------------------
 # Market Data Utility Functions
+# (price and instrument info come from the shared cache in app.utils.bybit_market)
 # ------------------------------------------------------------------------------
-def get_current_price(base_url: str, symbol: str):
-    """
-    Get the current market price for the given symbol.
-    """
-    try:
-        response = requests.get(f"{base_url}{Tickers}", params={"category": "linear", "symbol": symbol})
-        if response.status_code == 200:
-            return float(response.json()['result']['list'][0]['lastPrice'])
-        return None
-    except Exception:
-        return None
-
-def get_instrument_info(base_url: str, symbol: str):
-    """
-    Retrieve instrument information for the given symbol.
-    """
-    try:
-        response = requests.get(f"{base_url}{INSTUMENTS_INFO}", params={"category": "linear", "symbol": symbol})
-        if response.status_code == 200:
-            return response.json()['result']['list'][0]
-        return None
-    except Exception:
-        return None
-
 def get_symbol_info(base_url: str, symbol: str):
     """
     Get lot size filter details for the given symbol.
@@ -156,22 +99,8 @@ def get_position_info(symbol: str, api_key: str, api_secret: str, base_url: str)
     """
     Retrieve position information for the given symbol.
     """
-    endpoint = POSITION_LIST
     params = {'category': "linear", 'symbol': symbol}
-    query_str = '&'.join([f'{k}={v}' for k, v in params.items()])
-    #timestamp = str(int(time.time() * 1000))
-    # ✅ Use Bybit's server timestamp
-    timestamp = str(get_server_timestamp(base_url))
-
-    sign = generate_signature(api_key, api_secret, query_str, timestamp, recv_window)
-    headers = {
-        'X-BAPI-API-KEY': api_key,
-        'X-BAPI-SIGN': sign,
-        'X-BAPI-TIMESTAMP': timestamp,
-        'X-BAPI-RECV-WINDOW': recv_window,
-        'Content-Type': 'application/json'
-    }
-    return requests.get(f'{base_url}{endpoint}?{query_str}', headers=headers).json()
+    return signed_get(POSITION_LIST, params, api_key, api_secret, recv_window, base_url=base_url).json()
 
 # ------------------------------------------------------------------------------
 # Trading Action Functions
@@ -211,46 +140,29 @@ def create_market_order_action(base_url: str, api_key: str, api_secret: str, rec
         params["stopLoss"] = str(stop_loss)
     return send_post_request(base_url, CREATE_ORDER , api_key, api_secret, recv_window, params)
 
-def store_position_data_to_mongo(user_id: str, position_data: dict):
+def store_opened_trades(records: list):
     """
-    Store the given position data into the user's MongoDB collection.
+    Insert the opened positions and count them in the users' journals,
+    one bulk write each.
     """
-    
-    collection = db[f"user_{user_id}"]
-    collection.insert_one(position_data)
-
-def store_data_to_journal(user_id: str):
-
-    collection = db[f"user_{user_id}"]
-
-    trades = list(collection.find({"user_id": user_id}))
-
-    total_signals = len(trades)
-    signals_closed_in_profit = sum(1 for t in trades if t.get("status") == "TP")
-    signals_closed_in_loss = sum(1 for t in trades if t.get("status") == "SL")
-    current_running_signals = sum(1 for t in trades if t.get("status") == "OPEN")
-
-    profit_trades = [t for t in trades if t.get("status") == "TP" and "PNL" in t]
-    loss_trades = [t for t in trades if t.get("status") == "SL" and "PNL" in t]
-
-    avg_profit_usdt = sum(t["PNL"] for t in profit_trades if isinstance(t["PNL"], (int, float))) / len(profit_trades) if profit_trades else 0
-    avg_loss_usdt = sum(t["PNL"] for t in loss_trades if isinstance(t["PNL"], (int, float))) / len(loss_trades) if loss_trades else 0
+    if not records:
+        return
+    try:
+        trades_collection.insert_many(records, ordered=False)
+        record_trades_opened(db, [record["user_id"] for record in records])
+    except Exception as e:
+        print(f"[✖] Error storing {len(records)} opened trade(s): {str(e)}")
 
-    # Update or insert journal summary for this user
-    journal_collection.update_one(
-        {"User_Id": user_id},
-        {
-            "$set": {
-                "Total_Signals": total_signals,
-                "Signals_Closed_in_Profit": signals_closed_in_profit,
-                "Signals_Closed_in_Loss": signals_closed_in_loss,
-                "Current_Running_Signals": current_running_signals,
-                "Avg_Profit_USDT": round(avg_profit_usdt, 2),
-                "Avg_Loss_USDT": round(avg_loss_usdt, 2)
-            }
-        },
-        upsert=True
-    )
+def store_when_done(future):
+    """
+    Store the position of a pipeline that outlived the batch deadline.
+    """
+    try:
+        _, record = future.result()
+    except Exception:
+        return
+    if record:
+        store_opened_trades([record])
 
 # ------------------------------------------------------------------------------
 # Trade Calculation Functions
@@ -283,11 +195,12 @@ def fetch_subscriptions_by_symbol(symbol: str):
     """
     return list(subscriptions_collection.find({"symbol": symbol}))
 
-def find_user_by_id(user_id_str: str):
+def find_users_by_ids(user_ids) -> dict:
     """
-    Retrieve a user document by its ID.
+    Retrieve the user documents for all given IDs in one query, keyed by ID string.
     """
-    return users_collection.find_one({"_id": ObjectId(user_id_str)})
+    ids = [ObjectId(u) for u in set(user_ids) if u and ObjectId.is_valid(u)]
+    return {str(u["_id"]): u for u in users_collection.find({"_id": {"$in": ids}})}
 
 def build_trade_info(trade_data: dict, sub: dict, user: dict) -> dict:
     """
@@ -309,6 +222,80 @@ def build_trade_info(trade_data: dict, sub: dict, user: dict) -> dict:
         "secret_key": user.get("secret_key")
     }
 
+# ------------------------------------------------------------------------------
+# Per-User Order Pipeline
+# ------------------------------------------------------------------------------
+def open_trade_for_subscription(trade_data: dict, sub: dict, user: dict):
+    """
+    Run the exchange side of the order pipeline for one subscription: set
+    leverage, place the market order and read back the position.
+    Returns (per-user result entry, trade record to store or None).
+    """
+    user_id = sub.get("user_id")
+
+    info = build_trade_info(trade_data, sub, user)
+    try:
+        validate_direction(info["direction"])
+    except ValueError as e:
+        return {"user_id": user_id, "status": "failed", "error": str(e)}, None
+
+    usdt_amount = compute_usdt_amount(info["bot_initial_balance"], info["investment_per_trade"], info["amount_multiplier"])
+
+    try:
+        leverage_resp = set_leverage_action(BASE_URL, info["api_key"], info["secret_key"],recv_window, info["symbol"])
+        if leverage_resp.status_code != 200:
+            return {
+                "user_id": user_id,
+                "status": "failed",
+                "error": "Leverage error",
+                "response": leverage_resp.json()
+            }, None
+    except Exception as e:
+        return {"user_id": user_id, "status": "failed", "error": str(e)}, None
+
+    try:
+        order_resp = create_market_order_action(
+            BASE_URL,
+            info["api_key"],
+            info["secret_key"],
+            recv_window,
+            info["symbol"],
+            info["direction"],
+            info["stop_loss"],
+            info["take_profit"],
+            usdt_amount
+        )
+        if order_resp and order_resp.status_code == 200:
+            order_data = order_resp.json()  # Define order_data properly
+            order_id = order_data.get("result", {}).get("orderId")  # Extract orderId
+            result = {"user_id": user_id, "status": "success", "order": order_data}
+            record = None
+            position_data = get_position_info(info["symbol"], info["api_key"], info["secret_key"], BASE_URL)
+            print("position_data retCode -> ",position_data["retCode"])
+            #if position_data["retCode"] == 0 and position_data["result"]["list"]:
+            if (position_data["retCode"] == 0 and position_data["result"]["list"] and  float(position_data["result"]["list"][0]['avgPrice']) != 0 ):
+                pos = position_data["result"]["list"][0]
+                record = {
+                    "user_id": user_id,
+                    "orderId": order_id,
+                    "symbol": pos['symbol'],
+                    "direction": 'LONG' if pos['side'] == 'Buy' else 'SHORT',
+                    "entry_time": datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%fZ'),
+                    "entry_price": float(pos['avgPrice']),
+                    "stop_loss": float(pos['stopLoss']) if pos['stopLoss'] else None,
+                    "take_profit": float(pos['takeProfit']) if pos['takeProfit'] else None,
+                    "leverage": pos['leverage'],
+                    "initial_margin": float(pos['positionIM']),
+                    "status": "OPEN",
+                    "PNL": None,
+                    "exit_time": None
+                }
+            return result, record
+
+        return {"user_id": user_id, "status": "failed", "order": order_resp.json() if order_resp else None}, None
+    except Exception as e:
+        return {"user_id": user_id, "status": "failed", "error": str(e)}, None
+
 # ------------------------------------------------------------------------------
 # Flask Route: Open Trade
 # ------------------------------------------------------------------------------
@@ -318,8 +305,11 @@ def open_trade():
     Process the open trade request:
       1. Parse the incoming trade data.
       2. Validate the symbol and fetch subscriptions.
-      3. For each subscription, validate direction, compute trade amount,
-        set leverage, create a market order, and store the position.
+      3. Load all subscribed users in one query.
+      4. Dispatch one order pipeline per subscription on the shared executor
+        and collect the results in subscription order, waiting at most
+        OPEN_TRADE_TIMEOUT seconds for the whole batch.
+      5. Store the opened positions and journal counts in bulk.
     """
     trade_data = parse_trade_data(request)
     if not trade_data.get("symbol"):
@@ -333,78 +323,33 @@ def open_trade():
             "message": f"No users have subscribed to {trade_data['symbol']} yet."
         }), 404
 
+    users = find_users_by_ids(sub.get("user_id") for sub in subscriptions)
+    dispatched = [(sub, users.get(sub.get("user_id"))) for sub in subscriptions]
+    dispatched = [(sub, user) for sub, user in dispatched if user]
+    futures = [order_executor.submit(open_trade_for_subscription, trade_data, sub, user) for sub, user in dispatched]
+    wait(futures, timeout=OPEN_TRADE_TIMEOUT)
+
     results = []
-    for sub in subscriptions:
+    records = []
+    for (sub, _), future in zip(dispatched, futures):
         user_id = sub.get("user_id")
-        user = find_user_by_id(user_id)
-        if not user:
-            continue
-
-        info = build_trade_info(trade_data, sub, user)
-        try:
-            validate_direction(info["direction"])
-        except ValueError as e:
-            results.append({"user_id": user_id, "status": "failed", "error": str(e)})
+        if not future.done():
+            if future.cancel():
+                # Never started, so no order was sent for this user
+                results.append({"user_id": user_id, "status": "failed", "error": "Timed out before the order was sent"})
+            else:
+                # Still talking to the exchange; it finishes in the background
+                results.append({"user_id": user_id, "status": "pending", "error": f"Still processing after {OPEN_TRADE_TIMEOUT:g}s"})
+                future.add_done_callback(store_when_done)
             continue
-
-        usdt_amount = compute_usdt_amount(info["bot_initial_balance"], info["investment_per_trade"], info["amount_multiplier"])
-
         try:
-            leverage_resp = set_leverage_action(BASE_URL, info["api_key"], info["secret_key"],recv_window, info["symbol"])
-            if leverage_resp.status_code != 200:
-                results.append({
-                    "user_id": user_id,
-                    "status": "failed",
-                    "error": "Leverage error",
-                    "response": leverage_resp.json()
-                })
-                continue
+            result, record = future.result()
         except Exception as e:
-            results.append({"user_id": user_id, "status": "failed", "error": str(e)})
-            continue
+            result, record = {"user_id": user_id, "status": "failed", "error": str(e)}, None
+        results.append(result)
+        if record:
+            records.append(record)
 
-        try:
-            order_resp = create_market_order_action(
-                BASE_URL,
-                info["api_key"],
-                info["secret_key"],
-                recv_window,
-                info["symbol"],
-                info["direction"],
-                info["stop_loss"],
-                info["take_profit"],
-                usdt_amount
-            )
-            if order_resp and order_resp.status_code == 200:
-                order_data = order_resp.json()  # Define order_data properly
-                order_id = order_data.get("result", {}).get("orderId")  # Extract orderId
-                results.append({"user_id": user_id, "status": "success", "order": order_resp.json()})
-                position_data = get_position_info(info["symbol"], info["api_key"], info["secret_key"], BASE_URL)
-                print("position_data retCode -> ",position_data["retCode"])
-                #if position_data["retCode"] == 0 and position_data["result"]["list"]:
-                if (position_data["retCode"] == 0 and position_data["result"]["list"] and  float(position_data["result"]["list"][0]['avgPrice']) != 0 ):
-                    pos = position_data["result"]["list"][0]
-                    record = {
-                        "user_id": user_id,
-                        "orderId": order_id,
-                        "symbol": pos['symbol'],
-                        "direction": 'LONG' if pos['side'] == 'Buy' else 'SHORT',
-                        "entry_time": datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%fZ'),
-                        "entry_price": float(pos['avgPrice']),
-                        "stop_loss": float(pos['stopLoss']) if pos['stopLoss'] else None,
-                        "take_profit": float(pos['takeProfit']) if pos['takeProfit'] else None,
-                        "leverage": pos['leverage'],
-                        "initial_margin": float(pos['positionIM']),
-                        "status": "OPEN",
-                        "PNL": None,
-                        "exit_time": None
-                    }
-                    store_position_data_to_mongo(user_id, record)
-                    store_data_to_journal(user_id)
-
-            else:
-                results.append({"user_id": user_id, "status": "failed", "order": order_resp.json() if order_resp else None})
-        except Exception as e:
-            results.append({"user_id": user_id, "status": "failed", "error": str(e)})
+    store_opened_trades(records)
 
     return jsonify({"message": f"Processed {len(results)} user(s)", "results": results}), 200
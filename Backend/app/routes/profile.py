@@ -22,7 +22,7 @@ def profile():
     user_id = get_jwt_identity()  # Get user ID from JWT token
 
     # Convert the string user ID into a MongoDB ObjectId for querying
-    user = mongo.db.users.find_one({"_id": ObjectId(user_id)}, {"password": False})  # Exclude password
+    user = mongo.db.users.find_one({"_id": ObjectId(user_id)}, {"password": False, "settled_trades": False})  # Exclude password and settle bookkeeping
 
     # If no user found, return 404
     if not user:
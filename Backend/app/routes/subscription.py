@@ -8,12 +8,11 @@ from flask_cors import CORS
 from flask import Blueprint,request, jsonify
 from urllib.parse import urljoin
 from datetime import datetime, UTC
-import hmac
-import requests
-import hashlib
 import base64
-import time
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.utils.bybit_client import signed_get
+from app.utils.journal_stats import record_trades_removed
+from app.utils.trade_store import TRADES_COLLECTION
 
 # ===============================
 # Load Environment Variables
@@ -24,7 +23,6 @@ load_dotenv()
 # Fetch Bybit API endpoints and base URL
 BASE_URL = os.getenv("BASE_URL")
 WALLETENDPOINT = os.getenv("WALLETENDPOINT")
-TIME_ENDPOINT = os.getenv("TIME_ENDPOINT")
 
 # ===============================
 # Blueprint and CORS Setup
@@ -33,23 +31,6 @@ TIME_ENDPOINT = os.getenv("TIME_ENDPOINT")
 subscription_bp = Blueprint("subscription", __name__)
 CORS(subscription_bp)  # Enable CORS for this blueprint
 
-# ===============================
-# Utility Function: Get Server Timestamp
-# ===============================
-def get_server_timestamp():
-    """
-    Fetch the correct server timestamp from Bybit to avoid time drift issues.
-    If unavailable, fallback to local system time (milliseconds).
-    """
-    try:
-        response = requests.get(f"{BASE_URL}{TIME_ENDPOINT}")
-        if response.status_code == 200:
-            data = response.json()
-            return int(data["result"]["timeNano"]) // 1_000_000  # Convert nano to ms
-    except Exception as e:
-        print(f"Error fetching server time: {e}")
-    return int(time.time() * 1000)  # Fallback to local time
-
 # ===============================
 # Utility Function: Get USDT Balance
 # ===============================
@@ -59,23 +40,8 @@ def get_usdt_balance(api_key, api_secret):
     Returns wallet balance as float if successful, else -1.
     """
     params = {"accountType": "UNIFIED"}
-    timestamp = str(get_server_timestamp())
-    recv_window = "10000"
-
-    # Create query string in sorted order for signing
-    query_string = '&'.join(f"{k}={v}" for k, v in sorted(params.items()))
-    signature_payload = f"{timestamp}{api_key}{recv_window}{query_string}"
-
-    # Generate HMAC SHA256 signature required by Bybit
-    signature = hmac.new(api_secret.encode("utf-8"), signature_payload.encode("utf-8"), hashlib.sha256).hexdigest()
-    headers = {
-        "X-BAPI-API-KEY": api_key,
-        "X-BAPI-TIMESTAMP": timestamp,
-        "X-BAPI-RECV-WINDOW": recv_window,
-        "X-BAPI-SIGN": signature
-    }
-    # Make GET request to Bybit wallet endpoint
-    response = requests.get(f"{BASE_URL}{WALLETENDPOINT}", params=params, headers=headers)
+    # Signed GET to Bybit wallet endpoint via the shared client
+    response = signed_get(WALLETENDPOINT, params, api_key, api_secret)
     # Parse for USDT balance
     if response.status_code == 200:
         data = response.json()
@@ -242,24 +208,13 @@ def delete_subscription(user_id, bot_name):
     # Step 4: Remove subscription entry from DB
     mongo.db.subscriptions.delete_one({"user_id": user_id, "bot_name": bot_name})
 
-    # Step 5: Remove all OPEN trades for this symbol in user's trade collection
-    collection = mongo.db[f"user_{user_id}"]
+    # Step 5: Remove all of the user's OPEN trades for this symbol
     symbol = subscription.get("symbol", "").replace("/", "")  
-    deleted_result = collection.delete_many({"symbol": symbol, "status": "OPEN"})
+    deleted_result = mongo.db[TRADES_COLLECTION].delete_many({"user_id": user_id, "symbol": symbol, "status": "OPEN"})
     deleted_count = deleted_result.deleted_count
 
     # Step 6: Update journal stats to subtract deleted trades
-    journal = mongo.db.journals.find_one({"User_Id": user_id})
-    if journal:
-        updated_total_signals = max(journal.get("Total_Signals", 0) - deleted_count, 0)
-        updated_running_signals = max(journal.get("Current_Running_Signals", 0) - deleted_count, 0)
-        mongo.db.journals.update_one(
-            {"User_Id": user_id},
-            {"$set": {
-                "Total_Signals": updated_total_signals,
-                "Current_Running_Signals": updated_running_signals
-            }}
-        )
+    record_trades_removed(mongo.db, user_id, deleted_count)
 
     # Respond with a summary
     return jsonify({
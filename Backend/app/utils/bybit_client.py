@@ -0,0 +1,163 @@
+import os
+import time
+import hmac
+import json
+import random
+import hashlib
+import threading
+import urllib.parse
+import requests
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+from app.utils.bybit_clock import get_server_timestamp
+
+# ------------------------------------------------------------------------------
+# Configuration
+# ------------------------------------------------------------------------------
+load_dotenv()
+
+BASE_URL = os.getenv("BASE_URL")
+RECV_WINDOW = "10000"
+
+BYBIT_POOL_SIZE = int(os.getenv("BYBIT_POOL_SIZE", "32"))         # keep-alive connections per host
+BYBIT_TIMEOUT = (3.05, float(os.getenv("BYBIT_READ_TIMEOUT", "10")))  # (connect, read) seconds
+BYBIT_MAX_RETRIES = int(os.getenv("BYBIT_MAX_RETRIES", "3"))
+BYBIT_BACKOFF = float(os.getenv("BYBIT_BACKOFF", "0.25"))          # first retry delay, doubled each time
+BYBIT_KEY_RATE = float(os.getenv("BYBIT_KEY_RATE", "10"))          # signed requests per second per API key
+BYBIT_KEY_BURST = int(os.getenv("BYBIT_KEY_BURST", "10"))
+
+RATE_LIMIT_RET_CODE = 10006
+
+# ------------------------------------------------------------------------------
+# Pooled Session
+# ------------------------------------------------------------------------------
+session = requests.Session()
+_adapter = HTTPAdapter(pool_connections=4, pool_maxsize=BYBIT_POOL_SIZE)
+session.mount("https://", _adapter)
+session.mount("http://", _adapter)
+
+# ------------------------------------------------------------------------------
+# Per-Key Rate Limiting
+# ------------------------------------------------------------------------------
+class TokenBucket:
+    """
+    Blocking token bucket: acquire() waits until a request may be sent.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+def _bucket_for(api_key: str) -> TokenBucket:
+    with _buckets_lock:
+        bucket = _buckets.get(api_key)
+        if bucket is None:
+            bucket = _buckets[api_key] = TokenBucket(BYBIT_KEY_RATE, BYBIT_KEY_BURST)
+        return bucket
+
+# ------------------------------------------------------------------------------
+# Signing
+# ------------------------------------------------------------------------------
+def sign(api_key: str, api_secret: str, timestamp: str, recv_window: str, payload: str) -> str:
+    """
+    HMAC SHA256 signature over timestamp + api_key + recv_window + payload.
+    """
+    return hmac.new(api_secret.encode("utf-8"), f"{timestamp}{api_key}{recv_window}{payload}".encode("utf-8"), hashlib.sha256).hexdigest()
+
+def signed_headers(api_key: str, api_secret: str, recv_window: str, payload: str) -> dict:
+    timestamp = str(get_server_timestamp())
+    return {
+        "X-BAPI-API-KEY": api_key,
+        "X-BAPI-TIMESTAMP": timestamp,
+        "X-BAPI-RECV-WINDOW": recv_window,
+        "X-BAPI-SIGN": sign(api_key, api_secret, timestamp, recv_window, payload),
+        "Content-Type": "application/json"
+    }
+
+# ------------------------------------------------------------------------------
+# Requests with Retry
+# ------------------------------------------------------------------------------
+def _is_rate_limited(response) -> bool:
+    try:
+        return response.json().get("retCode") == RATE_LIMIT_RET_CODE
+    except ValueError:
+        return False
+
+def _backoff(attempt: int):
+    time.sleep(BYBIT_BACKOFF * (2 ** attempt) * random.uniform(0.5, 1.5))
+
+def _send(method: str, url: str, build_headers=None, data=None, api_key=None, idempotent=True):
+    """
+    Send a request on the pooled session. Rate-limit rejections (retCode
+    10006) are retried for every method since the exchange did not act on
+    them; 5xx responses and connection errors only for idempotent calls, so
+    an order is never placed twice. Signed requests are re-signed per attempt.
+    """
+    for attempt in range(BYBIT_MAX_RETRIES + 1):
+        last = attempt == BYBIT_MAX_RETRIES
+        if api_key:
+            _bucket_for(api_key).acquire()
+        headers = build_headers() if build_headers else None
+        try:
+            response = session.request(method, url, data=data, headers=headers, timeout=BYBIT_TIMEOUT)
+        except requests.exceptions.RequestException:
+            if last or not idempotent:
+                raise
+            _backoff(attempt)
+            continue
+        if not last and ((idempotent and response.status_code >= 500) or _is_rate_limited(response)):
+            _backoff(attempt)
+            continue
+        return response
+
+def public_get(path: str, params: dict = None, base_url: str = BASE_URL):
+    """
+    Unauthenticated GET (market data).
+    """
+    query_string = urllib.parse.urlencode(params or {})
+    return _send("GET", f"{base_url}{path}?{query_string}")
+
+def signed_get(path: str, params: dict, api_key: str, api_secret: str, recv_window: str = RECV_WINDOW, base_url: str = BASE_URL):
+    """
+    Authenticated GET; the query string is signed in the order given.
+    """
+    query_string = urllib.parse.urlencode(params)
+    return _send(
+        "GET",
+        f"{base_url}{path}?{query_string}",
+        build_headers=lambda: signed_headers(api_key, api_secret, recv_window, query_string),
+        api_key=api_key
+    )
+
+def signed_post(path: str, params: dict, api_key: str, api_secret: str, recv_window: str = RECV_WINDOW, base_url: str = BASE_URL):
+    """
+    Authenticated POST with a compact, key-sorted JSON body.
+    """
+    json_payload = json.dumps(dict(sorted(params.items())), separators=(',', ':'))
+    return _send(
+        "POST",
+        f"{base_url}{path}",
+        build_headers=lambda: signed_headers(api_key, api_secret, recv_window, json_payload),
+        data=json_payload,
+        api_key=api_key,
+        idempotent=False
+    )
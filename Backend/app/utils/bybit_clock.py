@@ -0,0 +1,120 @@
+import os
+import time
+import logging
+import threading
+from dotenv import load_dotenv
+
+# ------------------------------------------------------------------------------
+# Configuration
+# ------------------------------------------------------------------------------
+load_dotenv()
+
+BASE_URL = os.getenv("BASE_URL")
+TIME_ENDPOINT = os.getenv("TIME_ENDPOINT")
+
+CLOCK_SYNC_INTERVAL = float(os.getenv("CLOCK_SYNC_INTERVAL", "60"))  # seconds between re-syncs
+CLOCK_SYNC_SAMPLES = int(os.getenv("CLOCK_SYNC_SAMPLES", "5"))       # time requests per sync
+CLOCK_FIRST_SYNC_WAIT = float(os.getenv("CLOCK_FIRST_SYNC_WAIT", "5"))  # max seconds a signer waits for the first sync
+
+logger = logging.getLogger(__name__)
+
+# ------------------------------------------------------------------------------
+# Server Clock
+# ------------------------------------------------------------------------------
+class ServerClock:
+    """
+    Tracks the offset between local time and the exchange clock so signed
+    requests can be timestamped without a /market/time round trip each.
+
+    Each sync sends a few time requests and keeps the sample with the
+    smallest round trip, assuming the server read its clock halfway through
+    it (NTP-style). Requests go through the pooled bybit_client session; a
+    sample that needed a retry has an inflated round trip and loses to the
+    others. start() launches a daemon thread that syncs at once and then
+    every `interval` seconds. The app starts it at startup; callers of
+    now_ms() wait (up to CLOCK_FIRST_SYNC_WAIT) for the first sync, so a
+    burst of signed requests is not stamped with unsynced local time. If
+    that sync fails the offset stays 0, i.e. local time.
+    """
+
+    def __init__(self, base_url: str, endpoint: str, interval: float = CLOCK_SYNC_INTERVAL, samples: int = CLOCK_SYNC_SAMPLES):
+        self.base_url = base_url
+        self.endpoint = endpoint
+        self.interval = interval
+        self.samples = samples
+        self.offset_ms = 0.0
+        self.rtt_ms = None
+        self.synced_at = None
+        self._lock = threading.Lock()
+        self._thread = None
+        self._first_sync = threading.Event()
+
+    def _sample(self):
+        # Imported here: bybit_client imports this module to sign requests
+        from app.utils.bybit_client import public_get
+        t0 = time.time()
+        response = public_get(self.endpoint, base_url=self.base_url)
+        t1 = time.time()
+        response.raise_for_status()
+        server_ms = int(response.json()["result"]["timeNano"]) / 1_000_000
+        local_ms = (t0 + t1) * 500  # midpoint of the round trip, in ms
+        return (t1 - t0) * 1000, server_ms - local_ms
+
+    def sync(self) -> bool:
+        """
+        Measure the offset now. Returns False (keeping the previous offset)
+        if no time request succeeded.
+        """
+        best = None
+        for _ in range(self.samples):
+            try:
+                sample = self._sample()
+            except Exception as e:
+                logger.warning(f"Error fetching server time: {e}")
+                continue
+            if best is None or sample[0] < best[0]:
+                best = sample
+        if best is None:
+            return False
+        with self._lock:
+            self.rtt_ms, self.offset_ms = best
+            self.synced_at = time.time()
+        return True
+
+    def _run(self):
+        try:
+            self.sync()
+        finally:
+            self._first_sync.set()
+        while True:
+            time.sleep(self.interval)
+            self.sync()
+
+    def start(self):
+        """
+        Start syncing in the background (no-op if already started).
+        """
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="bybit-clock", daemon=True)
+            self._thread.start()
+
+    def now_ms(self) -> int:
+        """
+        Current exchange time in milliseconds, waiting for the first sync if
+        it is still in progress.
+        """
+        if not self._first_sync.is_set():
+            self.start()
+            self._first_sync.wait(CLOCK_FIRST_SYNC_WAIT)
+        return int(time.time() * 1000 + self.offset_ms)
+
+
+server_clock = ServerClock(BASE_URL, TIME_ENDPOINT)
+
+def get_server_timestamp() -> int:
+    """
+    Exchange time in milliseconds for signing requests.
+    """
+    return server_clock.now_ms()
@@ -0,0 +1,109 @@
+import os
+import time
+import threading
+from dotenv import load_dotenv
+from app.utils.bybit_client import public_get
+
+# ------------------------------------------------------------------------------
+# Configuration
+# ------------------------------------------------------------------------------
+load_dotenv()
+
+Tickers = os.getenv("Tickers")
+INSTUMENTS_INFO = os.getenv("INSTUMENTS_INFO")
+
+# Instrument filters (lot size, leverage) change rarely; prices change constantly
+INSTRUMENT_INFO_TTL = float(os.getenv("INSTRUMENT_INFO_TTL", "300"))
+TICKER_TTL = float(os.getenv("TICKER_TTL", "0.5"))
+
+# ------------------------------------------------------------------------------
+# TTL Cache
+# ------------------------------------------------------------------------------
+class TTLCache:
+    """
+    Thread-safe cache whose entries expire after `ttl` seconds.
+    Concurrent misses on the same key share a single fetch, so a signal
+    fanned out to many users still makes one public call per key.
+    Failed fetches (None) are not cached.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = {}    # key -> (expires_at, value)
+        self._inflight = {}   # key -> threading.Event
+
+    def get(self, key, loader):
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry and entry[0] > time.monotonic():
+                    return entry[1]
+                event = self._inflight.get(key)
+                if event is None:
+                    event = self._inflight[key] = threading.Event()
+                    break
+            # Another thread is fetching this key; use its result
+            event.wait()
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry and entry[0] > time.monotonic():
+                    return entry[1]
+            # That fetch failed; fall through and try ourselves
+
+        try:
+            value = loader()
+            if value is not None:
+                with self._lock:
+                    self._entries[key] = (time.monotonic() + self.ttl, value)
+            return value
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            event.set()
+
+    def invalidate(self, key=None):
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+
+instrument_cache = TTLCache(INSTRUMENT_INFO_TTL)
+ticker_cache = TTLCache(TICKER_TTL)
+
+# ------------------------------------------------------------------------------
+# Market Data
+# ------------------------------------------------------------------------------
+def _fetch_current_price(base_url: str, symbol: str):
+    try:
+        response = public_get(Tickers, {"category": "linear", "symbol": symbol}, base_url)
+        if response.status_code == 200:
+            return float(response.json()['result']['list'][0]['lastPrice'])
+        return None
+    except Exception:
+        return None
+
+def _fetch_instrument_info(base_url: str, symbol: str):
+    try:
+        response = public_get(INSTUMENTS_INFO, {"category": "linear", "symbol": symbol}, base_url)
+        if response.status_code == 200:
+            data = response.json()
+            if data.get('retCode') == 0 and data['result']['list']:
+                return data['result']['list'][0]
+        return None
+    except Exception:
+        return None
+
+def get_current_price(base_url: str, symbol: str):
+    """
+    Get the last traded price for the given symbol (cached for TICKER_TTL seconds).
+    """
+    return ticker_cache.get((base_url, symbol), lambda: _fetch_current_price(base_url, symbol))
+
+def get_instrument_info(base_url: str, symbol: str):
+    """
+    Retrieve instrument information for the given symbol (cached for INSTRUMENT_INFO_TTL seconds).
+    """
+    return instrument_cache.get((base_url, symbol), lambda: _fetch_instrument_info(base_url, symbol))
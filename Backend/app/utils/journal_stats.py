@@ -0,0 +1,149 @@
+import click
+from pymongo import UpdateOne
+from app.utils.trade_store import TRADES_COLLECTION, has_legacy_trades
+
+# ------------------------------------------------------------------------------
+# Incremental Journal Statistics
+# ------------------------------------------------------------------------------
+# Each journal keeps counters plus running PnL sums, updated with $inc as
+# trades open and close; averages are derived from the sums on read. A
+# journal without the sum fields predates this scheme and is rebuilt from
+# the user's trade history the first time it is touched, once that history
+# has been migrated out of the legacy user_{user_id} collection.
+#
+# Closes may be retried after a failed or partial write, so each carries an
+# event key; the journal remembers its recent keys in Applied_Events and a
+# delta whose key is already there is skipped.
+
+RUNNING_STATUSES = ("OPEN", "CLOSING")
+SUM_FIELDS = {"TP": "Profit_PNL_Sum", "SL": "Loss_PNL_Sum"}
+COUNT_FIELDS = {"TP": "Signals_Closed_in_Profit", "SL": "Signals_Closed_in_Loss"}
+APPLIED_EVENTS_KEPT = 500  # far more than can be awaiting a retry at once
+
+def empty_journal(user_id: str) -> dict:
+    """
+    Journal document for a user with no trades yet.
+    """
+    return {
+        "User_Id": user_id,
+        "Total_Signals": 0,
+        "Signals_Closed_in_Profit": 0,
+        "Signals_Closed_in_Loss": 0,
+        "Current_Running_Signals": 0,
+        "Profit_PNL_Sum": 0.0,
+        "Loss_PNL_Sum": 0.0,
+        "Avg_Profit_USDT": 0.0,
+        "Avg_Loss_USDT": 0.0
+    }
+
+def journal_averages(journal: dict) -> tuple:
+    """
+    (Avg_Profit_USDT, Avg_Loss_USDT) from the running sums, falling back
+    to the stored averages for journals that have not been rebuilt yet.
+    """
+    if "Profit_PNL_Sum" not in journal:
+        return journal.get("Avg_Profit_USDT", 0.0), journal.get("Avg_Loss_USDT", 0.0)
+    profits = journal.get("Signals_Closed_in_Profit", 0)
+    losses = journal.get("Signals_Closed_in_Loss", 0)
+    avg_profit = journal["Profit_PNL_Sum"] / profits if profits else 0
+    avg_loss = journal.get("Loss_PNL_Sum", 0.0) / losses if losses else 0
+    return round(avg_profit, 2), round(avg_loss, 2)
+
+def rebuild_journal(db, user_id: str, events: list = ()) -> dict:
+    """
+    Recompute a user's journal from their full trade history and store it.
+    `events` are keys of deltas the history already includes; they are
+    recorded in the same write so a retry does not apply them again.
+    """
+    journal = empty_journal(user_id)
+    trades = db[TRADES_COLLECTION].find({"user_id": user_id}, {"status": 1, "PNL": 1})
+    for trade in trades:
+        status = trade.get("status")
+        journal["Total_Signals"] += 1
+        if status in RUNNING_STATUSES:
+            journal["Current_Running_Signals"] += 1
+        elif status in COUNT_FIELDS:
+            journal[COUNT_FIELDS[status]] += 1
+            if isinstance(trade.get("PNL"), (int, float)):
+                journal[SUM_FIELDS[status]] += trade["PNL"]
+    journal["Avg_Profit_USDT"], journal["Avg_Loss_USDT"] = journal_averages(journal)
+    update = {"$set": journal}
+    if events:
+        update["$push"] = {"Applied_Events": {"$each": list(events), "$slice": -APPLIED_EVENTS_KEPT}}
+    db["journals"].update_one({"User_Id": user_id}, update, upsert=True)
+    return journal
+
+def _journal_update(user_id: str, inc: dict, event=None) -> UpdateOne:
+    query = {"User_Id": user_id, "Profit_PNL_Sum": {"$exists": True}}
+    update = {"$inc": inc}
+    if event is not None:
+        query["Applied_Events"] = {"$ne": event}
+        update["$push"] = {"Applied_Events": {"$each": [event], "$slice": -APPLIED_EVENTS_KEPT}}
+    return UpdateOne(query, update)
+
+def _apply(db, deltas: list):
+    """
+    Apply (user_id, $inc, event key or None) deltas in one bulk write; each
+    update is atomic, and one whose event key the journal already holds is
+    skipped, so a keyed batch can be retried safely. Journals without running
+    sums are rebuilt from history instead (the triggering trades are already
+    stored); users whose trades are not yet migrated are left for
+    `flask migrate-user-trades` to rebuild. A failed rebuild is logged rather
+    than raised, since the increments have landed and the journal is rebuilt
+    again on its next update.
+    """
+    if not deltas:
+        return
+    result = db["journals"].bulk_write([_journal_update(*delta) for delta in deltas], ordered=False)
+    if result.matched_count < len(deltas):
+        try:
+            user_ids = {delta[0] for delta in deltas}
+            ready = {j["User_Id"] for j in db["journals"].find(
+                {"User_Id": {"$in": list(user_ids)}, "Profit_PNL_Sum": {"$exists": True}}, {"User_Id": 1}
+            )}
+            for user_id in user_ids - ready:
+                if not has_legacy_trades(db, user_id):
+                    rebuild_journal(db, user_id, [d[2] for d in deltas if d[0] == user_id and d[2] is not None])
+        except Exception as e:
+            print(f"[✖] Error rebuilding journals: {str(e)}")
+
+def record_trades_opened(db, user_ids: list):
+    _apply(db, [(user_id, {"Total_Signals": 1, "Current_Running_Signals": 1}, None) for user_id in user_ids])
+
+def record_trades_closed(db, closes: list):
+    """
+    closes: (user_id, status, pnl, trade_id) per settled trade.
+    """
+    deltas = []
+    for user_id, status, pnl, trade_id in closes:
+        inc = {"Current_Running_Signals": -1}
+        if status in COUNT_FIELDS:
+            inc[COUNT_FIELDS[status]] = 1
+            if isinstance(pnl, (int, float)):
+                inc[SUM_FIELDS[status]] = pnl
+        deltas.append((user_id, inc, f"close:{trade_id}"))
+    _apply(db, deltas)
+
+def record_trades_removed(db, user_id: str, count: int):
+    """
+    OPEN trades deleted outright (e.g. when a subscription is removed).
+    """
+    if count:
+        _apply(db, [(user_id, {"Total_Signals": -count, "Current_Running_Signals": -count}, None)])
+
+# ------------------------------------------------------------------------------
+# CLI: flask rebuild-journals [--user-id ID]
+# ------------------------------------------------------------------------------
+@click.command("rebuild-journals")
+@click.option("--user-id", default=None, help="Rebuild a single user's journal (default: all users).")
+def rebuild_journals_command(user_id):
+    """
+    Recompute journal statistics from trade history.
+    """
+    from app import mongo
+    db = mongo.db
+    user_ids = [user_id] if user_id else [str(u["_id"]) for u in db.users.find({}, {"_id": 1})]
+    for uid in user_ids:
+        journal = rebuild_journal(db, uid)
+        click.echo(f"{uid}: {journal['Total_Signals']} signals, {journal['Current_Running_Signals']} running")
+    click.echo(f"Rebuilt {len(user_ids)} journal(s)")
@@ -0,0 +1,88 @@
+import click
+from pymongo import ReplaceOne
+
+# ------------------------------------------------------------------------------
+# User Trade Storage
+# ------------------------------------------------------------------------------
+# All users' trades live in one `trades` collection keyed by user_id (string),
+# replacing the per-user `user_{user_id}` collections. Run
+# `flask migrate-user-trades` before serving traffic to move existing data
+# across: until then close_trade cannot see trades still in the legacy
+# collections.
+
+TRADES_COLLECTION = "trades"
+
+TRADE_INDEXES = [
+    # Open-trade lookup on close: equality on the first four, newest entry first
+    ([("user_id", 1), ("symbol", 1), ("direction", 1), ("status", 1), ("entry_time", -1)], "user_symbol_direction_status_entry"),
+    # Journal open/closed lists sorted by exit_time
+    ([("user_id", 1), ("status", 1), ("exit_time", -1)], "user_status_exit"),
+    # Startup scan for trades left CLOSING
+    ([("status", 1)], "status"),
+]
+
+def ensure_trade_indexes(db):
+    """
+    Create the trades collection indexes (no-op if they already exist).
+    """
+    collection = db[TRADES_COLLECTION]
+    for keys, name in TRADE_INDEXES:
+        collection.create_index(keys, name=name)
+    return collection
+
+# ------------------------------------------------------------------------------
+# CLI: flask migrate-user-trades [--drop]
+# ------------------------------------------------------------------------------
+LEGACY_PREFIX = "user_"
+MIGRATE_BATCH = 1000
+
+def has_legacy_trades(db, user_id: str) -> bool:
+    """
+    Whether the user's legacy user_{user_id} collection still exists.
+    """
+    return bool(db.list_collection_names(filter={"name": f"{LEGACY_PREFIX}{user_id}"}))
+
+def migrate_user_collection(db, name: str) -> tuple:
+    """
+    Upsert every trade of one legacy user_{user_id} collection into the
+    trades collection (by _id, so re-running is safe).
+    Returns (documents read, documents written).
+    """
+    user_id = name[len(LEGACY_PREFIX):]
+    target = db[TRADES_COLLECTION]
+    read = written = 0
+    batch = []
+    for trade in db[name].find():
+        trade.setdefault("user_id", user_id)
+        batch.append(ReplaceOne({"_id": trade["_id"]}, trade, upsert=True))
+        read += 1
+        if len(batch) >= MIGRATE_BATCH:
+            result = target.bulk_write(batch, ordered=False)
+            written += result.upserted_count + result.matched_count
+            batch = []
+    if batch:
+        result = target.bulk_write(batch, ordered=False)
+        written += result.upserted_count + result.matched_count
+    return read, written
+
+@click.command("migrate-user-trades")
+@click.option("--drop", is_flag=True, help="Drop each legacy collection once all of its trades are copied.")
+def migrate_user_trades_command(drop):
+    """
+    Move trades from per-user user_{user_id} collections into `trades`,
+    then rebuild each migrated user's journal from the moved history.
+    """
+    from app import mongo
+    from app.utils.journal_stats import rebuild_journal
+    db = mongo.db
+    ensure_trade_indexes(db)
+    legacy = [name for name in db.list_collection_names() if name.startswith(LEGACY_PREFIX)]
+    for name in legacy:
+        read, written = migrate_user_collection(db, name)
+        status = "ok" if read == written else "INCOMPLETE"
+        rebuild_journal(db, name[len(LEGACY_PREFIX):])
+        if drop and read == written:
+            db.drop_collection(name)
+            status += ", dropped"
+        click.echo(f"{name}: {read} read, {written} written ({status})")
+    click.echo(f"Migrated {len(legacy)} collection(s)")